@@ -11,25 +11,46 @@ except ImportError:
     # If dotenv not available, just use environment variables
     pass
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from llm_cache import get_llm_response_cache
+
+# Default model settings (also part of the node cache fingerprint)
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_TEMPERATURE = 0.2
+
+def get_llm_provider():
+    """LLM backend selected by LLM_PROVIDER: "openai" (default) or "fake" for offline runs"""
+    return os.getenv("LLM_PROVIDER", "openai").lower()
 
 # Initialize LLM with environment variable or fallback
-def get_llm(model="gpt-4o-mini", temperature=0.2):
+def get_llm(model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
     """
     Get configured LLM instance
     Set OPENAI_API_KEY in .env file or as environment variable
+    Responses are cached on disk unless LLM_CACHE=0 (see llm_cache.py)
+    Requests share one rate limiter, retry policy and circuit breaker (see llm_client.py)
+    LLM_PROVIDER=fake selects the offline scripted model (see fake_llm.py)
     """
+    if get_llm_provider() == "fake":
+        from fake_llm import ScriptedChatModel
+        return ScriptedChatModel(
+            latency_seconds=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")) / 1000,
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0")),
+        )
+    
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         print("⚠️  WARNING: OPENAI_API_KEY not found. Set it in .env file or as environment variable")
         print("💡 For testing without OpenAI, the system will use mock responses")
         return None
     
-    return ChatOpenAI(
+    # Imported here so runs without an LLM never load langchain_openai
+    from llm_openai import RateLimitedChatOpenAI
+    return RateLimitedChatOpenAI(
         model=model,
         temperature=temperature,
-        api_key=api_key
+        api_key=api_key,
+        cache=get_llm_response_cache()
     )
 
 # Agent Prompts
@@ -113,6 +134,7 @@ CORRELATION_AGENT_PROMPT = ChatPromptTemplate.from_messages([
     - Run multivariate regression on TCR, SPI, DCR, and CI
     - Calculate R² scores and statistical significance (p-values)
     - Perform PCA for dimensionality reduction
+    - Screen the wider set of derived metrics for correlations that survive FDR control
     - Provide actionable insights on metric relationships
     """),
     MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -120,6 +142,21 @@ CORRELATION_AGENT_PROMPT = ChatPromptTemplate.from_messages([
     MessagesPlaceholder(variable_name="agent_scratchpad"),
 ])
 
+NARRATIVE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are the reporting lead of a multi-agent workforce monitoring system.
+    The productivity, sentiment, compliance, interaction and correlation metrics have already
+    been computed. Write one insight section per agent from the summary you are given.
+    
+    For each section:
+    - Interpret the metric's level and spread, naming notable entities where useful
+    - List the key findings, highest impact first
+    - Give concrete recommendations for managers
+    - For correlation, explain which metrics relate to outcomes and how reliable that is (R², p-values)
+    Base every statement on the provided numbers only.
+    """),
+    ("human", "Computed metrics (JSON):\n{metrics}"),
+])
+
 def get_configured_llm():
     """
     Get LLM or None for testing without API key.
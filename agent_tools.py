@@ -2,12 +2,16 @@
 LangChain Tools for Multi-AI Agent System
 Wraps agent functionality as LangChain tools for agent executors
 """
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool, tool
 from agents.ProductivityAgent import ProductivityAgent
 from agents.SentimentAgent import SentimentAgent
 from agents.ComplianceAgent import ComplianceAgent
 from agents.InteractionAgent import InteractionAgent
 from agents.CorrelationEngine import CorrelationEngine
+from agents.CorrelationMatrix import significant_pairs
+from agents.DatasetRepository import load_dataset
+from tool_cache import agent_metrics, run_cached_tools
+from tool_output import TOP_K, compact_output_enabled, frame_payload, metric_summary, round_values, to_compact_json
 import pandas as pd
 import os
 
@@ -26,8 +30,10 @@ def compute_productivity_metrics(file_path: str = "data/Agile_Projects_Dataset.x
         Summary of productivity metrics including average TCR and entity-level data
     """
     try:
-        agent = ProductivityAgent(file_path)
-        df = agent.get_metrics()
+        df = agent_metrics(ProductivityAgent, file_path)
+        
+        if compact_output_enabled():
+            return to_compact_json({"entities": len(df), **metric_summary(df, "TCR", "EntityID")})
         
         avg_tcr = df["TCR"].mean()
         summary = f"""Productivity Metrics Analysis:
@@ -49,14 +55,16 @@ Bottom 5 Performers:
         return f"Error computing productivity metrics: {str(e)}"
 
 @tool
-def get_productivity_data() -> pd.DataFrame:
+def get_productivity_data(file_path: str = "data/Agile_Projects_Dataset.xlsx") -> pd.DataFrame:
     """
     Get raw productivity metrics data as DataFrame.
     Returns EntityID and TCR for all projects.
+    
+    Args:
+        file_path: Path to the project dataset file (Excel or CSV)
     """
     try:
-        agent = ProductivityAgent("data/Agile_Projects_Dataset.xlsx")
-        return agent.get_metrics()
+        return agent_metrics(ProductivityAgent, file_path).copy()
     except Exception as e:
         return pd.DataFrame({"error": [str(e)]})
 
@@ -75,14 +83,20 @@ def compute_sentiment_metrics(file_path: str = None) -> str:
         Summary of sentiment metrics including average SPI and distribution
     """
     try:
-        agent = SentimentAgent(file_path)
-        df = agent.get_metrics()
+        df = agent_metrics(SentimentAgent, file_path)
         
         avg_spi = df["SPI"].mean()
         positive_count = len(df[df["SPI"] > 0.3])
         neutral_count = len(df[(df["SPI"] >= -0.3) & (df["SPI"] <= 0.3)])
         negative_count = len(df[df["SPI"] < -0.3])
         
+        if compact_output_enabled():
+            return to_compact_json({
+                "workers": len(df),
+                "distribution": {"positive": positive_count, "neutral": neutral_count, "negative": negative_count},
+                **metric_summary(df, "SPI", df.columns[0]),
+            })
+        
         summary = f"""Sentiment Analysis Results:
         
 😊 Total Workers Analyzed: {len(df)}
@@ -103,14 +117,16 @@ def compute_sentiment_metrics(file_path: str = None) -> str:
         return f"Error computing sentiment metrics: {str(e)}"
 
 @tool
-def get_sentiment_data() -> pd.DataFrame:
+def get_sentiment_data(file_path: str = None) -> pd.DataFrame:
     """
     Get raw sentiment metrics data as DataFrame.
     Returns worker identifiers and SPI scores.
+    
+    Args:
+        file_path: Optional path to sentiment data (defaults to mental_health_remote_workers.csv)
     """
     try:
-        agent = SentimentAgent()
-        return agent.get_metrics()
+        return agent_metrics(SentimentAgent, file_path).copy()
     except Exception as e:
         return pd.DataFrame({"error": [str(e)]})
 
@@ -129,11 +145,17 @@ def compute_compliance_metrics(file_path: str = None) -> str:
         Summary of compliance metrics including DCR by company
     """
     try:
-        agent = ComplianceAgent(file_path)
-        df = agent.get_metrics()
+        df = agent_metrics(ComplianceAgent, file_path)
         
         avg_dcr = df["DCR"].mean()
         
+        if compact_output_enabled():
+            return to_compact_json({
+                "companies": len(df),
+                "employees_impacted": int(df["Number of Employees Impacted"].sum()),
+                **metric_summary(df, "DCR", "Company Name"),
+            })
+        
         summary = f"""Compliance Analysis Results:
         
 🏢 Total Companies Analyzed: {len(df)}
@@ -151,14 +173,16 @@ Companies Needing Attention:
         return f"Error computing compliance metrics: {str(e)}"
 
 @tool
-def get_compliance_data() -> pd.DataFrame:
+def get_compliance_data(file_path: str = None) -> pd.DataFrame:
     """
     Get raw compliance metrics data as DataFrame.
     Returns company names and DCR scores.
+    
+    Args:
+        file_path: Optional path to compliance data
     """
     try:
-        agent = ComplianceAgent()
-        return agent.get_metrics()
+        return agent_metrics(ComplianceAgent, file_path).copy()
     except Exception as e:
         return pd.DataFrame({"error": [str(e)]})
 
@@ -177,14 +201,20 @@ def compute_interaction_metrics(file_path: str = None) -> str:
         Summary of collaboration metrics including average CI
     """
     try:
-        agent = InteractionAgent(file_path)
-        df = agent.get_metrics()
+        df = agent_metrics(InteractionAgent, file_path)
         
         avg_ci = df["CI"].mean()
         high_collab = len(df[df["CI"] > 0.7])
         medium_collab = len(df[(df["CI"] >= 0.4) & (df["CI"] <= 0.7)])
         low_collab = len(df[df["CI"] < 0.4])
         
+        if compact_output_enabled():
+            return to_compact_json({
+                "workers": len(df),
+                "distribution": {"high": high_collab, "medium": medium_collab, "low": low_collab},
+                **metric_summary(df, "CI", df.columns[0]),
+            })
+        
         summary = f"""Interaction Analysis Results:
         
 👥 Total Workers Analyzed: {len(df)}
@@ -205,14 +235,16 @@ Workers Needing Support:
         return f"Error computing interaction metrics: {str(e)}"
 
 @tool
-def get_interaction_data() -> pd.DataFrame:
+def get_interaction_data(file_path: str = None) -> pd.DataFrame:
     """
     Get raw interaction metrics data as DataFrame.
     Returns worker IDs and CI scores.
+    
+    Args:
+        file_path: Optional path to interaction data
     """
     try:
-        agent = InteractionAgent()
-        return agent.get_metrics()
+        return agent_metrics(InteractionAgent, file_path).copy()
     except Exception as e:
         return pd.DataFrame({"error": [str(e)]})
 
@@ -275,9 +307,73 @@ def compute_correlation_analysis(merged_data_path: str = "results/merged_metrics
     except Exception as e:
         return f"Error computing correlation analysis: {str(e)}"
 
-# Tool Collections for each agent
-PRODUCTIVITY_TOOLS = [compute_productivity_metrics, get_productivity_data]
-SENTIMENT_TOOLS = [compute_sentiment_metrics, get_sentiment_data]
-COMPLIANCE_TOOLS = [compute_compliance_metrics, get_compliance_data]
-INTERACTION_TOOLS = [compute_interaction_metrics, get_interaction_data]
-CORRELATION_TOOLS = [compute_correlation_analysis]
+@tool
+def compute_metric_correlations(file_path: str = "data/remote_worker_productivity_1000.csv",
+                                method: str = "spearman") -> str:
+    """
+    Correlate every numeric metric in a dataset (e.g. burnout, focus time, late task ratio,
+    tool usage) with p-values and Benjamini-Hochberg false discovery rate control.
+    
+    Args:
+        file_path: Path to a CSV or Excel dataset
+        method: "pearson" or "spearman"
+    
+    Returns:
+        The metric pairs that remain significant at 5% FDR, strongest first
+    """
+    try:
+        df = load_dataset(file_path)
+        result = CorrelationEngine().run_correlation_matrix(df, method=method)
+        pairs = significant_pairs(result)
+        metrics = len(result["r"].columns)
+        tested = metrics * (metrics - 1) // 2
+        
+        if compact_output_enabled():
+            return to_compact_json({
+                "method": method,
+                "metrics": metrics,
+                "pairs_tested": tested,
+                "significant_pairs": len(pairs),
+                "top": round_values(pairs.head(TOP_K)[["metric_a", "metric_b", "r", "q"]].to_dict("records")),
+            })
+        
+        summary = f"""Metric Correlation Matrix ({method}):
+        
+📊 Metrics: {metrics} ({tested} pairs tested)
+✅ Significant at 5% FDR: {len(pairs)} pairs
+
+Strongest Relationships:
+{pairs.head(10).to_string(index=False) if len(pairs) else "None"}
+"""
+        return summary
+    except Exception as e:
+        return f"Error computing metric correlations: {str(e)}"
+
+# ===== Compact data tools for LLM agents =====
+
+def compact_data_tool(data_tool, metric: str, id_col: str = None):
+    """
+    LLM-facing variant of a get_*_data tool with the same name and arguments.
+    Returns a compact JSON summary of the frame instead of the whole DataFrame
+    (the graph nodes keep calling the original tool for the data itself).
+    """
+    if not compact_output_enabled():
+        return data_tool
+
+    def run(**kwargs) -> str:
+        df = data_tool.invoke(kwargs)
+        return to_compact_json(frame_payload(df, metric, id_col or df.columns[0]))
+
+    return StructuredTool.from_function(
+        func=run,
+        name=data_tool.name,
+        description=data_tool.description,
+        args_schema=data_tool.args_schema,
+    )
+
+# Tool Collections for each agent (results memoized per graph run, see tool_cache.py)
+PRODUCTIVITY_TOOLS = run_cached_tools([compute_productivity_metrics, compact_data_tool(get_productivity_data, "TCR", "EntityID")])
+SENTIMENT_TOOLS = run_cached_tools([compute_sentiment_metrics, compact_data_tool(get_sentiment_data, "SPI")])
+COMPLIANCE_TOOLS = run_cached_tools([compute_compliance_metrics, compact_data_tool(get_compliance_data, "DCR", "Company Name")])
+INTERACTION_TOOLS = run_cached_tools([compute_interaction_metrics, compact_data_tool(get_interaction_data, "CI")])
+CORRELATION_TOOLS = run_cached_tools([compute_correlation_analysis, compute_metric_correlations])
@@ -0,0 +1,90 @@
+"""
+Bootstrap confidence intervals for the Outcome Correlation Index.
+Resamples are drawn as batched index matrices and every batch is fitted at once:
+centered normal equations solved with one batched solve (einsum for the Gram
+matrices) and PCA variance ratios from batched covariance eigenvalues.
+Batches are independent (one seed each), so they can run in a process pool and
+the result is the same whatever the number of workers.
+"""
+from functools import partial
+
+import numpy as np
+
+from agents.SeededBatches import map_seeded_batches
+
+BATCH_SIZE = 500
+
+
+def bootstrap_batch(X, y, n_resamples: int, seed, n_components: int = 2) -> dict:
+    """
+    Refit OLS (with intercept), R² and PCA explained variance on n_resamples resamples.
+    Returns: dict of arrays - coefficients (B, d+1), r_squared (B,), pca_variance (B, n_components).
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n, d = X.shape
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, size=(n_resamples, n))
+    Xb, yb = X[idx], y[idx]  # (B, n, d), (B, n)
+
+    x_mean, y_mean = Xb.mean(axis=1), yb.mean(axis=1)
+    Xc = Xb - x_mean[:, None, :]
+    yc = yb - y_mean[:, None]
+    gram = np.einsum("bni,bnj->bij", Xc, Xc)
+    cross = np.einsum("bni,bn->bi", Xc, yc)
+
+    try:
+        slopes = np.linalg.solve(gram, cross[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        # A degenerate resample (e.g. a constant column) - minimum-norm solution for the batch
+        slopes = np.einsum("bij,bj->bi", np.linalg.pinv(gram), cross)
+    intercepts = y_mean - np.einsum("bi,bi->b", slopes, x_mean)
+
+    sst = np.einsum("bn,bn->b", yc, yc)
+    ssr = sst - np.einsum("bi,bi->b", slopes, cross)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(sst > 0, 1.0 - ssr / sst, np.nan)
+
+    eigenvalues = np.linalg.eigvalsh(gram)[:, ::-1]  # descending
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pca_variance = eigenvalues[:, :n_components] / eigenvalues.sum(axis=1, keepdims=True)
+
+    return {
+        "coefficients": np.column_stack([intercepts, slopes]),
+        "r_squared": r_squared,
+        "pca_variance": pca_variance,
+    }
+
+
+def _interval(samples: np.ndarray, confidence: float) -> list:
+    tail = (1 - confidence) / 2 * 100
+    bounds = np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+    return np.round(bounds.T, 6).tolist()
+
+
+def bootstrap_intervals(X, y, n_resamples: int = 1000, confidence: float = 0.95, seed: int = 42,
+                        execution_backend: str = "thread", n_components: int = 2) -> dict:
+    """
+    Percentile bootstrap confidence intervals for the OLS coefficients, R² and PCA variance.
+    With the "process" backend the resample batches are spread across the shared worker pool.
+    Returns: {"resamples", "confidence", "intercept": [lo, hi], "coefficients": [[lo, hi], ...],
+              "r_squared": [lo, hi], "pca_variance": [[lo, hi], ...]}
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n, d = X.shape
+    # Each resample materializes n rows of the features and the outcome
+    batches = map_seeded_batches(partial(bootstrap_batch, X, y, n_components=n_components), n_resamples, seed,
+                                 max_batch=BATCH_SIZE, values_per_draw=n * (d + 1),
+                                 execution_backend=execution_backend)
+
+    coefficients = np.concatenate([b["coefficients"] for b in batches])
+    coefficient_bounds = _interval(coefficients, confidence)
+    return {
+        "resamples": int(n_resamples),
+        "confidence": confidence,
+        "intercept": coefficient_bounds[0],
+        "coefficients": coefficient_bounds[1:],
+        "r_squared": _interval(np.concatenate([b["r_squared"] for b in batches]), confidence),
+        "pca_variance": _interval(np.concatenate([b["pca_variance"] for b in batches]), confidence),
+    }
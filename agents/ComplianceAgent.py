@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+from agents.DatasetRepository import load_dataset
 
 class ComplianceAgent:
     def __init__(self, file_path=None):
@@ -11,7 +12,7 @@ class ComplianceAgent:
                 "data",
                 "Enterprise_GenAI_Adoption_Impact.csv"
             )
-        self.data = pd.read_csv(file_path)
+        self.data = load_dataset(file_path)
 
     def get_metrics(self):
         """
@@ -1,44 +1,104 @@
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.decomposition import PCA
-from scipy import stats
+from agents.Bootstrap import bootstrap_intervals
+from agents.CorrelationMatrix import correlation_matrix
+from agents.GroupedRegression import grouped_ols
+from agents.OnlineStats import OnlineRegressionStats
+from agents.Permutation import permutation_test
+from agents.StreamingPCA import BLOCK_ROWS, StreamingPCA, fit_memmap
+
+FEATURE_NAMES = ["TCR", "SPI", "DCR", "CI"]
+
+
+def qr_factorize(X, add_intercept: bool = True) -> dict:
+    """
+    Pivoted QR factorization of the design matrix, computed once and reusable for any
+    number of responses. Columns whose pivot falls below the rank tolerance are treated
+    as aliased (near-collinear) and excluded from the fit.
+    Returns: dict with design, Q, R, pivot order and numerical rank.
+    """
+    from scipy.linalg import qr
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    design = np.column_stack([np.ones(len(X)), X]) if add_intercept else X
+    Q, R, pivot = qr(design, mode="economic", pivoting=True)
+    diag = np.abs(np.diag(R))
+    tol = diag[0] * max(design.shape) * np.finfo(float).eps if diag.size else 0.0
+    rank = int(np.sum(diag > tol))
+    return {"design": design, "Q": Q, "R": R, "pivot": pivot, "rank": rank,
+            "add_intercept": add_intercept}
+
+
+def fit_ols(X, y, qr_design: dict = None) -> dict:
+    """
+    Ordinary least squares with full inference from a single QR factorization.
+    Aliased columns get a zero coefficient and NaN standard error / t / p.
+    Returns: dict with coefficients (intercept first), std_errors, t_stats, p_values,
+    r_squared, residual degrees of freedom and rank.
+    """
+    from scipy import stats
+    from scipy.linalg import solve_triangular
+    qr_design = qr_design or qr_factorize(X)
+    design, Q, R = qr_design["design"], qr_design["Q"], qr_design["R"]
+    pivot, rank = qr_design["pivot"], qr_design["rank"]
+    y = np.asarray(y, dtype=float)
+    n, p = design.shape
+
+    # Solve R_r b = Q_rᵀ y on the estimable columns, then undo the pivoting
+    R_r = R[:rank, :rank]
+    beta_r = solve_triangular(R_r, Q[:, :rank].T @ y)
+    coefficients = np.zeros(p)
+    coefficients[pivot[:rank]] = beta_r
+
+    fitted = Q[:, :rank] @ (Q[:, :rank].T @ y)
+    residuals = y - fitted
+    ssr = float(residuals @ residuals)
+    centered = y - y.mean() if qr_design["add_intercept"] else y
+    sst = float(centered @ centered)
+    if sst > 0:
+        r_squared = 1.0 - ssr / sst
+    else:
+        r_squared = 1.0 if ssr == 0 else 0.0
+
+    df_resid = n - rank
+    std_errors = np.full(p, np.nan)
+    if df_resid > 0:
+        # diag((RᵀR)⁻¹) = row sums of squares of R⁻¹, without forming XᵀX
+        R_inv = solve_triangular(R_r, np.eye(rank))
+        std_errors[pivot[:rank]] = np.sqrt(ssr / df_resid * np.sum(R_inv ** 2, axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stats = coefficients / std_errors
+    p_values = 2 * stats.t.sf(np.abs(t_stats), df=max(df_resid, 1))
+
+    return {
+        "coefficients": coefficients,
+        "std_errors": std_errors,
+        "t_stats": t_stats,
+        "p_values": p_values,
+        "fitted": fitted,
+        "r_squared": r_squared,
+        "df_resid": df_resid,
+        "rank": rank,
+    }
+
 
 class CorrelationEngine:
     def __init__(self):
-        self.model = LinearRegression()
-        self.pca = PCA(n_components=2)
+        self.pca = None
+        self.fit = None
+        self.online = OnlineRegressionStats(len(FEATURE_NAMES))
         self.p_values = None
         self.r_squared = None
         self.pca_explained_variance = None
+        self.pca_loadings = None
 
-    def calculate_p_values(self, X, y, predictions):
-        """Calculate p-values for regression coefficients using t-tests"""
-        n = len(y)
-        k = X.shape[1]
-        
-        # Calculate residuals
-        residuals = y - predictions
-        residual_std_error = np.sqrt(np.sum(residuals**2) / (n - k - 1))
-        
-        # Calculate standard errors for coefficients
-        X_with_intercept = np.column_stack([np.ones(n), X])
-        try:
-            var_covar_matrix = residual_std_error**2 * np.linalg.inv(X_with_intercept.T @ X_with_intercept)
-            std_errors = np.sqrt(np.diag(var_covar_matrix))
-            
-            # Calculate t-statistics
-            coefficients = np.concatenate([[self.model.intercept_], self.model.coef_])
-            t_stats = coefficients / std_errors
-            
-            # Calculate p-values (two-tailed)
-            p_values = 2 * (1 - stats.t.cdf(np.abs(t_stats), df=n - k - 1))
-            return p_values[1:]  # Return p-values for features (exclude intercept)
-        except:
-            return None
-
-    def run_regression(self, X, y):
+    def run_regression(self, X, y, bootstrap_resamples: int = 0, execution_backend: str = "thread",
+                       seed: int = 42, feature_names=FEATURE_NAMES, permutations: int = 0):
         """
         Run Multivariate Regression and PCA analysis with statistical significance.
+        With bootstrap_resamples > 0 also adds 95% bootstrap confidence intervals.
+        With permutations > 0 significance uses empirical permutation-test p-values instead
+        of t-test p-values (which assume normal residuals, e.g. not a binary outcome).
         Returns: Outcome Correlation Index with R², P-values, and PCA variance explained.
         """
         if len(X) < 2:
@@ -46,29 +106,45 @@ class CorrelationEngine:
             return {"r_squared": np.nan, "p_values": None, "significance": "Insufficient data"}
         
         # Calculate feature variances to detect problematic data
-        feature_names = ["TCR", "SPI", "DCR", "CI"]
+        feature_names = list(feature_names)
+        X = np.asarray(X, dtype=float)
         variances = np.var(X, axis=0)
         
         print("\n📊 Feature Statistics:")
         for i, name in enumerate(feature_names):
             print(f"   {name}: mean={np.mean(X[:, i]):.4f}, std={np.std(X[:, i]):.4f}, var={variances[i]:.6f}")
         
-        # Fit Linear Regression model
-        self.model.fit(X, y)
-        predictions = self.model.predict(X)
-        
-        # Calculate R² score
-        self.r_squared = self.model.score(X, y)
+        # Fit OLS (coefficients, standard errors, t-stats, p-values and R²) from one QR factorization
+        qr_design = qr_factorize(X)
+        self.fit = fit_ols(X, y, qr_design)
+        self.r_squared = self.fit["r_squared"]
+        coefficients = self.fit["coefficients"][1:]
+        # p-values need residual degrees of freedom (N > number of estimable coefficients)
+        self.p_values = self.fit["p_values"][1:] if self.fit["df_resid"] > 0 else None
+        if self.fit["rank"] < X.shape[1] + 1:
+            print(f"⚠️ Near-collinear features: {X.shape[1] + 1 - self.fit['rank']} coefficient(s) not estimable")
         
-        # Calculate p-values for statistical significance
-        self.p_values = self.calculate_p_values(X, y, predictions)
+        # Permutation test: the same QR factorization fits every shuffled outcome
+        permutation = None
+        parametric_p_values = self.p_values
+        if permutations and permutations > 0:
+            permutation = permutation_test(X, y, n_permutations=int(permutations), seed=seed,
+                                           execution_backend=execution_backend, qr_design=qr_design)
+            self.p_values = np.asarray(permutation["p_values"])
+            print(f"\n🔀 Permutation test ({permutation['permutations']} shuffles): "
+                  f"R² p-value={permutation['r_squared_p_value']:.6f}")
         
-        # Perform PCA analysis
+        # Perform PCA analysis (streamed over row blocks, same result as a full-batch fit)
         try:
-            self.pca.fit(X)
-            self.pca_explained_variance = self.pca.explained_variance_ratio_
-        except:
+            self.pca = StreamingPCA(X.shape[1], n_components=2)
+            for start in range(0, len(X), BLOCK_ROWS):
+                self.pca.partial_fit(X[start:start + BLOCK_ROWS])
+            self.pca_explained_variance = self.pca.explained_variance_ratio()
+            self.pca_loadings = self.pca.components()
+        except ValueError as e:
+            print(f"⚠️ PCA skipped: {e}")
             self.pca_explained_variance = None
+            self.pca_loadings = None
         
         # Determine overall significance (if any p-value < 0.05)
         if self.p_values is not None:
@@ -92,20 +168,107 @@ class CorrelationEngine:
         if self.p_values is not None:
             print("\n   Feature Analysis:")
             for i, name in enumerate(feature_names):
-                coef = self.model.coef_[i]
+                coef = coefficients[i]
                 p_val = self.p_values[i]
                 sig_marker = "✓" if p_val < 0.05 else "✗"
-                print(f"   {sig_marker} {name}: coef={coef:.6f}, p-value={p_val:.6f}")
+                print(f"   {sig_marker} {name}: coef={coef:.6f}, se={self.fit['std_errors'][i + 1]:.6f}, "
+                      f"t={self.fit['t_stats'][i + 1]:.3f}, p-value={p_val:.6f}")
+        
+        # Bootstrap confidence intervals for coefficients, R² and PCA variance
+        bootstrap = None
+        if bootstrap_resamples and bootstrap_resamples > 0:
+            bootstrap = bootstrap_intervals(X, y, n_resamples=int(bootstrap_resamples), seed=seed,
+                                            execution_backend=execution_backend)
+            print(f"\n   Bootstrap 95% CIs ({bootstrap['resamples']} resamples):")
+            print(f"   R²: [{bootstrap['r_squared'][0]:.4f}, {bootstrap['r_squared'][1]:.4f}]")
+            for name, (low, high) in zip(feature_names, bootstrap["coefficients"]):
+                print(f"   {name}: [{low:.6f}, {high:.6f}]")
         
         # Create Outcome Correlation Index report
         outcome_correlation_index = {
-            "r_squared": round(self.r_squared, 4),
-            "p_values": [round(p, 6) for p in self.p_values] if self.p_values is not None else None,
+            "r_squared": round(float(self.r_squared), 4),
+            "p_values": [round(float(p), 6) for p in self.p_values] if self.p_values is not None else None,
+            "p_value_method": "permutation" if permutation else "t-test",
+            "parametric_p_values": [round(float(p), 6) for p in parametric_p_values] if parametric_p_values is not None else None,
             "significance": significance,
             "feature_names": feature_names,
-            "coefficients": [round(c, 6) for c in self.model.coef_],
-            "variances": [round(v, 6) for v in variances],
-            "pca_variance": [round(v, 4) for v in self.pca_explained_variance] if self.pca_explained_variance is not None else None
+            "intercept": round(float(self.fit["coefficients"][0]), 6),
+            "coefficients": [round(float(c), 6) for c in coefficients],
+            "std_errors": [round(float(s), 6) for s in self.fit["std_errors"][1:]],
+            "t_stats": [round(float(t), 4) for t in self.fit["t_stats"][1:]],
+            "variances": [round(float(v), 6) for v in variances],
+            "stats": OnlineRegressionStats(len(feature_names)).add(X, y).to_dict(),
+            "pca_variance": [round(float(v), 4) for v in self.pca_explained_variance] if self.pca_explained_variance is not None else None,
+            "pca_loadings": np.round(self.pca_loadings, 4).tolist() if self.pca_loadings is not None else None,
+            "bootstrap": bootstrap,
+            "permutation": permutation
         }
         
-        return outcome_correlation_index
\ No newline at end of file
+        return outcome_correlation_index
+
+    def update(self, X, y) -> dict:
+        """
+        Fold a micro-batch into the engine's online statistics and return the refreshed
+        correlations and regression (cost independent of the rows seen so far).
+        """
+        self.online.add(X, y)
+        return summarize_stats(self.online)
+
+    def run_pca_memmap(self, path: str, n_components: int = 2, columns=None,
+                       block_rows: int = BLOCK_ROWS) -> dict:
+        """
+        Out-of-core PCA of a memory-mapped .npy metric matrix (rows x metrics), streamed
+        in row blocks so the matrix never has to fit in RAM.
+        Returns: {"n", "pca_variance", "pca_loadings"}
+        """
+        self.pca = fit_memmap(path, n_components=n_components, columns=columns, block_rows=block_rows)
+        self.pca_explained_variance = self.pca.explained_variance_ratio()
+        self.pca_loadings = self.pca.components()
+        return {
+            "n": self.pca.n,
+            "pca_variance": [round(float(v), 4) for v in self.pca_explained_variance],
+            "pca_loadings": np.round(self.pca_loadings, 4).tolist(),
+        }
+
+    def run_correlation_matrix(self, frame, method: str = "pearson", alpha: float = 0.05) -> dict:
+        """
+        Pearson/Spearman matrix over any set of metric columns with p-values and
+        Benjamini-Hochberg q-values (see agents.CorrelationMatrix).
+        """
+        return correlation_matrix(frame, method=method, alpha=alpha)
+
+    def run_grouped_regression(self, X, y, groups, feature_names=FEATURE_NAMES):
+        """
+        Fit the OCS regression separately for every segment (e.g. industry sector or country)
+        in one batched pass. Segments too small or collinear to fit report NaN.
+        Returns DataFrame: segment, n, r_squared, intercept, coef_*, se_*, p_* per feature.
+        """
+        import pandas as pd
+        fit = grouped_ols(X, y, groups)
+        report = pd.DataFrame({
+            "segment": fit["segments"],
+            "n": fit["n"],
+            "r_squared": fit["r_squared"].round(4),
+            "intercept": fit["coefficients"][:, 0].round(6),
+        })
+        for i, name in enumerate(feature_names, start=1):
+            report[f"coef_{name}"] = fit["coefficients"][:, i].round(6)
+            report[f"se_{name}"] = fit["std_errors"][:, i].round(6)
+            report[f"p_{name}"] = fit["p_values"][:, i].round(6)
+        return report
+
+
+def summarize_stats(stats: OnlineRegressionStats, feature_names=FEATURE_NAMES) -> dict:
+    """Outcome Correlation Index fields computed from accumulated (possibly merged) statistics"""
+    fit = stats.regression()
+    p_values = fit["p_values"][1:] if fit["df_resid"] > 0 else None
+    return {
+        "n": stats.n,
+        "r_squared": round(float(fit["r_squared"]), 4),
+        "p_values": [round(float(p), 6) for p in p_values] if p_values is not None else None,
+        "feature_names": list(feature_names),
+        "intercept": round(float(fit["coefficients"][0]), 6),
+        "coefficients": [round(float(c), 6) for c in fit["coefficients"][1:]],
+        "std_errors": [round(float(se), 6) for se in fit["std_errors"][1:]],
+        "correlation": np.round(stats.correlation(), 4).tolist(),
+    }
@@ -0,0 +1,130 @@
+"""
+Correlation matrices for arbitrary metric sets.
+Pearson or Spearman coefficients, their p-values and Benjamini-Hochberg adjusted
+q-values are computed with matrix products only. Rows are processed in blocks and
+missing values are handled pairwise, so hundreds of columns over millions of rows
+need memory for one row block plus a few d x d accumulators.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+CORRELATION_METHODS = ("pearson", "spearman")
+BLOCK_ROWS = 65536
+
+
+def _pairwise_moments(values: np.ndarray, block_rows: int):
+    """
+    Pairwise-complete count, sums and cross-products (d x d each), accumulated over
+    row blocks on data shifted by the first block's column means, which keeps the sums
+    well conditioned without an extra pass (any shift leaves the correlations unchanged).
+    """
+    d = values.shape[1]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-missing columns in the first block
+        center = np.nan_to_num(np.nanmean(values[:block_rows], axis=0)) if len(values) else np.zeros(d)
+    n = np.zeros((d, d))
+    sums = np.zeros((d, d))      # sums[i, j] = Σ x_i over rows where x_i and x_j are observed
+    squares = np.zeros((d, d))   # squares[i, j] = Σ x_i² over the same rows
+    cross = np.zeros((d, d))     # cross[i, j] = Σ x_i x_j
+
+    for start in range(0, len(values), block_rows):
+        block = values[start:start + block_rows] - center
+        observed = ~np.isnan(block)
+        if observed.all():
+            # Fully observed block: the pairwise terms reduce to column sums
+            n += len(block)
+            sums += block.sum(axis=0)[:, None]
+            squares += (block * block).sum(axis=0)[:, None]
+            cross += block.T @ block
+            continue
+        mask = observed.astype(float)
+        block = np.where(observed, block, 0.0)
+        n += mask.T @ mask
+        sums += block.T @ mask
+        squares += (block * block).T @ mask
+        cross += block.T @ block
+    return n, sums, squares, cross
+
+
+def benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """Benjamini-Hochberg adjusted p-values (q-values) of a flat array; NaN entries are ignored"""
+    p_values = np.asarray(p_values, dtype=float)
+    q_values = np.full(p_values.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    if valid.size == 0:
+        return q_values
+    order = valid[np.argsort(p_values[valid], kind="stable")]
+    ranked = p_values[order] * valid.size / np.arange(1, valid.size + 1)
+    q_values[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q_values
+
+
+def correlation_matrix(frame: pd.DataFrame, method: str = "pearson", alpha: float = 0.05,
+                       block_rows: int = BLOCK_ROWS) -> dict:
+    """
+    Correlation matrix of every numeric column with p-values and FDR control.
+
+    Args:
+        frame: Metrics as columns (non-numeric columns are ignored)
+        method: "pearson" or "spearman" (Pearson on average ranks; each column is ranked
+                once over its observed values, which matches pairwise ranking when nothing is missing)
+        alpha: False discovery rate for the Benjamini-Hochberg significance matrix
+        block_rows: Rows accumulated per block
+
+    Returns:
+        {"method", "r", "p", "q", "n", "significant"} - d x d DataFrames (q and significant
+        apply BH across the distinct off-diagonal pairs)
+    """
+    from scipy import stats
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+    numeric = frame.select_dtypes(include="number")
+    if method == "spearman":
+        numeric = numeric.rank(method="average", na_option="keep")
+    columns = list(numeric.columns)
+    values = numeric.to_numpy(dtype=float)
+
+    n, sums, squares, cross = _pairwise_moments(values, block_rows)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        covariance = cross - sums * sums.T / n
+        variance = squares - sums * sums / n
+        r = np.clip(covariance / np.sqrt(variance * variance.T), -1.0, 1.0)
+        np.fill_diagonal(r, np.where(np.diag(variance) > 0, 1.0, np.nan))
+
+        df = n - 2
+        t = r * np.sqrt(df / np.maximum(1.0 - r * r, np.finfo(float).tiny))
+        p = np.where(df > 0, 2 * stats.t.sf(np.abs(t), np.maximum(df, 1)), np.nan)
+    np.fill_diagonal(p, np.nan)
+
+    upper = np.triu_indices(len(columns), k=1)
+    q = np.full(p.shape, np.nan)
+    q[upper] = benjamini_hochberg(p[upper])
+    q.T[upper] = q[upper]
+
+    as_frame = lambda matrix: pd.DataFrame(matrix, index=columns, columns=columns)
+    return {
+        "method": method,
+        "r": as_frame(r),
+        "p": as_frame(p),
+        "q": as_frame(q),
+        "n": as_frame(n.astype(int)),
+        "significant": as_frame(q < alpha),
+    }
+
+
+def significant_pairs(result: dict, alpha: float = 0.05) -> pd.DataFrame:
+    """Distinct metric pairs with q < alpha, strongest evidence first"""
+    columns = list(result["r"].columns)
+    i, j = np.triu_indices(len(columns), k=1)
+    pairs = pd.DataFrame({
+        "metric_a": np.asarray(columns, dtype=object)[i],
+        "metric_b": np.asarray(columns, dtype=object)[j],
+        "r": result["r"].to_numpy()[i, j],
+        "p": result["p"].to_numpy()[i, j],
+        "q": result["q"].to_numpy()[i, j],
+        "n": result["n"].to_numpy()[i, j],
+    })
+    pairs = pairs[pairs["q"] < alpha].assign(strength=lambda p: p["r"].abs())
+    return pairs.sort_values(["q", "strength"], ascending=[True, False]).drop(columns="strength").reset_index(drop=True)
@@ -0,0 +1,46 @@
+import os
+import threading
+import pandas as pd
+
+
+class DatasetRepository:
+    """
+    In-memory cache of loaded datasets keyed by path, modification time and size.
+    Keeps source files parsed between runs in long-lived processes (daemon, batch runner);
+    a file is re-read as soon as it changes on disk.
+    """
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def load(self, file_path: str) -> pd.DataFrame:
+        """Return a private copy of the dataset (agents add columns to their data)"""
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._frames.get(key)
+        if entry is None or entry[0] != version:
+            if file_path.lower().endswith((".xlsx", ".xls")):
+                frame = pd.read_excel(file_path)
+            else:
+                frame = pd.read_csv(file_path)
+            entry = (version, frame)
+            with self._lock:
+                self._frames[key] = entry
+
+        return entry[1].copy()
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+# Shared repository used by all agents in this process
+repository = DatasetRepository()
+
+
+def load_dataset(file_path: str) -> pd.DataFrame:
+    """Load a CSV or Excel dataset through the shared repository"""
+    return repository.load(file_path)
@@ -0,0 +1,86 @@
+"""
+Grouped OLS: one regression per segment in a single pass.
+Rows are sorted by segment, per-segment XᵀX / Xᵀy / yᵀy are accumulated with
+segmented reductions (np.add.reduceat) and all the small normal-equation
+systems are solved in one batched call.
+"""
+import numpy as np
+import pandas as pd
+
+
+def grouped_ols(X, y, groups) -> dict:
+    """
+    OLS with intercept fitted separately for every segment label in `groups`.
+    Segments with too few rows or collinear features get NaN results.
+    Returns: dict with segments (G,), n (G,), coefficients (G, d+1, intercept first),
+    std_errors, t_stats, p_values (G, d+1), r_squared (G,) and df_resid (G,).
+    """
+    from scipy import stats
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes, segments = pd.factorize(pd.Series(groups), sort=True)
+    valid = codes >= 0  # rows without a segment label are left out
+    codes, X, y = codes[valid], X[valid], y[valid]
+
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    # Centering on the global means keeps the accumulated cross-products well conditioned
+    x_mean = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+    y_mean = y.mean() if len(y) else 0.0
+    Z = np.column_stack([np.ones(len(order)), X[order] - x_mean, y[order] - y_mean])
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    counts = np.diff(np.r_[starts, len(codes)])
+
+    # Segmented sums of every product pair: (G, d+2, d+2) moment matrices
+    k = Z.shape[1]
+    moments = np.zeros((len(starts), k, k))
+    if len(starts):
+        for i in range(k):
+            for j in range(i, k):
+                moments[:, i, j] = moments[:, j, i] = np.add.reduceat(Z[:, i] * Z[:, j], starts)
+
+    p = k - 1
+    xtx, xty, yty = moments[:, :p, :p], moments[:, :p, p], moments[:, p, p]
+    solvable = counts > p
+    if solvable.any():
+        # Rank on the unit-diagonal scaling so differently scaled metrics are judged alike
+        scale = 1.0 / np.sqrt(np.maximum(np.diagonal(xtx[solvable], axis1=1, axis2=2), np.finfo(float).tiny))
+        solvable[solvable] = np.linalg.matrix_rank(xtx[solvable] * scale[:, :, None] * scale[:, None, :]) == p
+
+    coefficients = np.full((len(starts), p), np.nan)
+    std_errors = np.full((len(starts), p), np.nan)
+    r_squared = np.full(len(starts), np.nan)
+    df_resid = counts - p
+    if solvable.any():
+        A, b = xtx[solvable], xty[solvable]
+        inverse = np.linalg.solve(A, np.broadcast_to(np.eye(p), A.shape))
+        beta = np.einsum("gij,gj->gi", inverse, b)
+        ssr = np.maximum(yty[solvable] - np.einsum("gi,gi->g", beta, b), 0.0)
+        sst = yty[solvable] - moments[solvable, 0, p] ** 2 / counts[solvable]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r_squared[solvable] = np.where(sst > 0, 1.0 - ssr / sst, np.where(ssr == 0, 1.0, 0.0))
+        cov = (ssr / df_resid[solvable])[:, None, None] * inverse
+
+        # Undo the centering: slopes are unchanged, the intercept moves back to the raw scale
+        # (b0 = b0_c + ȳ - m·b, so Var(b0) = Var(b0_c) - 2 m·Cov(b0_c, b) + mᵀ Cov(b) m)
+        m = x_mean
+        beta[:, 0] += y_mean - beta[:, 1:] @ m
+        variances = np.diagonal(cov, axis1=1, axis2=2).copy()
+        variances[:, 0] += -2 * cov[:, 0, 1:] @ m + np.einsum("i,gij,j->g", m, cov[:, 1:, 1:], m)
+        coefficients[solvable] = beta
+        std_errors[solvable] = np.sqrt(np.maximum(variances, 0.0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stats = coefficients / std_errors
+        p_values = 2 * stats.t.sf(np.abs(t_stats), df=np.maximum(df_resid, 1)[:, None])
+
+    return {
+        "segments": np.asarray(segments),
+        "n": counts,
+        "coefficients": coefficients,
+        "std_errors": std_errors,
+        "t_stats": t_stats,
+        "p_values": p_values,
+        "r_squared": r_squared,
+        "df_resid": df_resid,
+    }
@@ -1,5 +1,5 @@
-import pandas as pd
 import os
+from agents.DatasetRepository import load_dataset
 
 class InteractionAgent:
     def __init__(self, file_path=None):
@@ -11,7 +11,7 @@ class InteractionAgent:
                 "data",
                 "remote_worker_productivity_1000.csv"
             )
-        self.data = pd.read_csv(file_path)
+        self.data = load_dataset(file_path)
 
     def get_metrics(self):
         """
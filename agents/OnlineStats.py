@@ -0,0 +1,160 @@
+import numpy as np
+
+
+class OnlineMoments:
+    """
+    Streaming count, column means and co-moment matrix (centered ZᵀZ) of row batches,
+    updated with Welford/Chan batch formulas. Batches can be added, removed again
+    (sliding windows) and accumulators from shards merged exactly.
+    """
+    def __init__(self, n_columns: int):
+        self.n = 0
+        self.mean = np.zeros(n_columns)
+        self.comoment = np.zeros((n_columns, n_columns))
+
+    @staticmethod
+    def _batch(Z):
+        Z = np.asarray(Z, dtype=float)
+        mean = Z.mean(axis=0) if len(Z) else np.zeros(Z.shape[1])
+        centered = Z - mean
+        return len(Z), mean, centered.T @ centered
+
+    def _combine(self, n_b, mean_b, comoment_b, sign=1):
+        """Chan et al. pairwise update; sign=-1 removes a batch previously added"""
+        if sign > 0:
+            n = self.n + n_b
+            if n == 0:
+                return
+            delta = mean_b - self.mean
+            self.mean = self.mean + delta * (n_b / n)
+            self.comoment = self.comoment + comoment_b + np.outer(delta, delta) * (self.n * n_b / n)
+        else:
+            n = self.n - n_b
+            if n < 0:
+                raise ValueError("Cannot remove more rows than were added")
+            if n == 0:
+                self.mean = np.zeros_like(self.mean)
+                self.comoment = np.zeros_like(self.comoment)
+                self.n = 0
+                return
+            rest_mean = (self.n * self.mean - n_b * mean_b) / n
+            delta = mean_b - rest_mean
+            self.comoment = self.comoment - comoment_b - np.outer(delta, delta) * (n * n_b / self.n)
+            self.mean = rest_mean
+        self.n = n
+
+    def add_rows(self, Z) -> "OnlineMoments":
+        """Fold a batch of rows into the statistics"""
+        self._combine(*self._batch(Z))
+        return self
+
+    def remove_rows(self, Z) -> "OnlineMoments":
+        """Take a previously added batch of rows back out"""
+        self._combine(*self._batch(Z), sign=-1)
+        return self
+
+    def merge(self, other: "OnlineMoments") -> "OnlineMoments":
+        """Fold in another accumulator (e.g. a shard's); the result equals one pass over both"""
+        if other.mean.shape != self.mean.shape:
+            raise ValueError("Cannot merge statistics over different column counts")
+        self._combine(other.n, other.mean, other.comoment)
+        return self
+
+    def covariance(self) -> np.ndarray:
+        """Sample covariance (ddof=1)"""
+        return self.comoment / (self.n - 1) if self.n > 1 else np.full_like(self.comoment, np.nan)
+
+    def correlation(self) -> np.ndarray:
+        """Pearson correlation matrix; NaN for constant columns"""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.comoment / np.outer(scale, scale)
+
+
+class OnlineRegressionStats(OnlineMoments):
+    """
+    Streaming sufficient statistics for correlation and OLS over rows (x, y):
+    the moments of [x, y], i.e. the centered XᵀX / Xᵀy / yᵀy.
+    Every summary costs O(d³) regardless of N.
+    """
+    def __init__(self, n_features: int):
+        super().__init__(n_features + 1)
+        self.n_features = n_features
+
+    def add(self, X, y) -> "OnlineRegressionStats":
+        """Fold a micro-batch of rows into the statistics"""
+        return self.add_rows(np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)]))
+
+    def remove(self, X, y) -> "OnlineRegressionStats":
+        """Take a previously added batch of rows back out"""
+        return self.remove_rows(np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)]))
+
+    def regression(self) -> dict:
+        """
+        OLS with intercept from the accumulated statistics.
+        Returns: same keys as CorrelationEngine.fit_ols (without fitted values).
+        """
+        from scipy import stats
+        from scipy.linalg import qr, cho_factor, cho_solve
+        d = self.n_features
+        Cxx, Cxy, Cyy = self.comoment[:d, :d], self.comoment[:d, d], self.comoment[d, d]
+
+        # Constant columns and columns collinear with earlier pivots are aliased. The rank is
+        # judged on the correlation-scaled matrix; a Gram matrix squares the condition number,
+        # hence the looser tolerance than a QR of X itself would need.
+        varying = np.flatnonzero(np.diag(Cxx) > 0)
+        keep = varying
+        if varying.size:
+            scale = np.sqrt(np.diag(Cxx)[varying])
+            _, R, pivot = qr(Cxx[np.ix_(varying, varying)] / np.outer(scale, scale), pivoting=True)
+            diag = np.abs(np.diag(R))
+            keep = np.sort(varying[pivot[:int(np.sum(diag > diag[0] * 1e-10))]])
+
+        slopes = np.zeros(d)
+        inverse = np.zeros((d, d))
+        if keep.size:
+            factor = cho_factor(Cxx[np.ix_(keep, keep)])
+            slopes[keep] = cho_solve(factor, Cxy[keep])
+            inverse[np.ix_(keep, keep)] = cho_solve(factor, np.eye(keep.size))
+
+        x_mean, y_mean = self.mean[:d], self.mean[d]
+        coefficients = np.concatenate([[y_mean - slopes @ x_mean], slopes])
+        ssr = max(float(Cyy - slopes @ Cxy), 0.0)
+        if Cyy > 0:
+            r_squared = 1.0 - ssr / Cyy
+        else:
+            r_squared = 1.0 if ssr == 0 else 0.0
+
+        rank = keep.size + 1
+        df_resid = self.n - rank
+        std_errors = np.full(d + 1, np.nan)
+        if df_resid > 0:
+            sigma2 = ssr / df_resid
+            std_errors[0] = np.sqrt(sigma2 * (1.0 / self.n + x_mean @ inverse @ x_mean))
+            std_errors[1:][keep] = np.sqrt(sigma2 * np.diag(inverse)[keep])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_stats = coefficients / std_errors
+        p_values = 2 * stats.t.sf(np.abs(t_stats), df=max(df_resid, 1))
+
+        return {
+            "coefficients": coefficients,
+            "std_errors": std_errors,
+            "t_stats": t_stats,
+            "p_values": p_values,
+            "r_squared": r_squared,
+            "df_resid": df_resid,
+            "rank": rank,
+        }
+
+    def to_dict(self) -> dict:
+        """Plain-list form for graph state, JSON and cross-process transfer"""
+        return {"n_features": self.n_features, "n": self.n,
+                "mean": self.mean.tolist(), "comoment": self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OnlineRegressionStats":
+        stats = cls(int(data["n_features"]))
+        stats.n = int(data["n"])
+        stats.mean = np.asarray(data["mean"], dtype=float)
+        stats.comoment = np.asarray(data["comoment"], dtype=float)
+        return stats
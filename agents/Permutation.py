@@ -0,0 +1,85 @@
+"""
+Permutation tests for the Outcome Correlation Index.
+The t-test p-values assume normal residuals, which a binary outcome (TCR > 70)
+violates. Here the outcome is shuffled instead: permuted outcome vectors are
+generated as whole matrices (one column per permutation) and all of them are
+fitted against a single QR factorization of X with one triangular solve.
+Empirical p-values count the permutations whose statistic is at least as extreme
+as the observed one. Batches are independent (one seed each), so they can run in
+the process pool and the result does not depend on the number of workers.
+"""
+from functools import partial
+
+import numpy as np
+
+from agents.SeededBatches import map_seeded_batches
+
+BATCH_SIZE = 1000
+
+
+def permutation_batch(qr_design: dict, y, n_permutations: int, seed, observed_t, observed_r2) -> dict:
+    """
+    Fit n_permutations shuffles of y against a precomputed factorization.
+    Returns: exceed counts - coefficients (p,) of |t| >= |observed t|, r_squared of R² >= observed R².
+    """
+    from scipy.linalg import solve_triangular
+    Q, R, pivot, rank = qr_design["Q"], qr_design["R"], qr_design["pivot"], qr_design["rank"]
+    y = np.asarray(y, dtype=float)
+    n, p = qr_design["design"].shape
+    rng = np.random.default_rng(seed)
+    Y = rng.permuted(np.broadcast_to(y[:, None], (n, n_permutations)), axis=0)  # (n, B)
+
+    Q_r, R_r = Q[:, :rank], R[:rank, :rank]
+    projected = Q_r.T @ Y  # (rank, B)
+    beta = solve_triangular(R_r, projected)
+    ssr = np.maximum(np.einsum("nb,nb->b", Y, Y) - np.einsum("rb,rb->b", projected, projected), 0.0)
+
+    # Permutations leave ȳ and the total sum of squares unchanged
+    centered = y - y.mean() if qr_design["add_intercept"] else y
+    sst = float(centered @ centered)
+    df_resid = n - rank
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = 1.0 - ssr / sst if sst > 0 else np.zeros(n_permutations)
+        R_inv = solve_triangular(R_r, np.eye(rank))
+        scale = np.sqrt(np.sum(R_inv ** 2, axis=1))[:, None] * np.sqrt(ssr / max(df_resid, 1))[None, :]
+        t_stats = np.abs(beta / scale)
+
+    observed = np.abs(np.asarray(observed_t, dtype=float)[pivot[:rank]])
+    exceed = np.zeros(p)
+    exceed[pivot[:rank]] = np.sum(t_stats >= observed[:, None] * (1 - 1e-12), axis=1)
+    return {
+        "coefficients": exceed,
+        "r_squared": float(np.sum(r_squared >= observed_r2 - 1e-12)),
+    }
+
+
+def permutation_test(X, y, n_permutations: int = 1000, seed: int = 42,
+                     execution_backend: str = "thread", qr_design: dict = None) -> dict:
+    """
+    Empirical p-values for every OLS coefficient (|t| statistic) and for R² (the global test),
+    from n_permutations shuffles of y. With the "process" backend the permutation batches are
+    spread across the shared worker pool.
+    Returns: {"permutations", "p_values": [per feature], "r_squared_p_value"}
+    (aliased features get NaN; shuffling y says nothing about the intercept, so it is not tested)
+    """
+    from agents.CorrelationEngine import fit_ols, qr_factorize
+    y = np.asarray(y, dtype=float)
+    qr_design = qr_design or qr_factorize(X)
+    observed = fit_ols(X, y, qr_design)
+
+    # Each permutation materializes one shuffled copy of y
+    fit_batch = partial(permutation_batch, qr_design, y,
+                        observed_t=observed["t_stats"], observed_r2=observed["r_squared"])
+    batches = map_seeded_batches(fit_batch, n_permutations, seed, max_batch=BATCH_SIZE,
+                                 values_per_draw=len(y), execution_backend=execution_backend)
+
+    # (exceed + 1) / (B + 1) counts the observed outcome as one of the permutations
+    exceed = np.sum([b["coefficients"] for b in batches], axis=0)
+    p_values = (exceed + 1) / (n_permutations + 1)
+    p_values[np.isnan(observed["t_stats"])] = np.nan
+    r_squared_p = (sum(b["r_squared"] for b in batches) + 1) / (n_permutations + 1)
+    return {
+        "permutations": int(n_permutations),
+        "p_values": [round(float(p), 6) for p in p_values[1:]],
+        "r_squared_p_value": round(float(r_squared_p), 6),
+    }
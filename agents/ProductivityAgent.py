@@ -1,14 +1,11 @@
 # https://www.kaggle.com/datasets/digrok/agile-project-dataset-2024
-import pandas as pd
+from agents.DatasetRepository import load_dataset
 
 
 class ProductivityAgent:
     def __init__(self, file_path: str):
         # Support both CSV (legacy) and Excel (Agile_Projects_Dataset.xlsx)
-        if file_path.lower().endswith((".xlsx", ".xls")):
-            self.data = pd.read_excel(file_path)
-        else:
-            self.data = pd.read_csv(file_path)
+        self.data = load_dataset(file_path)
 
     def get_metrics(self):
         """
@@ -25,5 +22,6 @@ class ProductivityAgent:
             # Fallback: Agile Effectiveness is proxy for task completion rate
             df["TCR"] = df["Agile Effectiveness"].astype(float) / 5 * 100
 
-        df["EntityID"] = [f"Project_{i+1}" for i in range(len(df))]
+        # IDs follow the row position so a subset of rows (e.g. one shard) keeps its IDs
+        df["EntityID"] = [f"Project_{i+1}" for i in df.index]
         return df[["EntityID", "TCR"]]
\ No newline at end of file
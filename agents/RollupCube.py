@@ -0,0 +1,160 @@
+"""
+Hierarchical rollup cube (e.g. worker -> team -> organization).
+Rows are sorted once by their hierarchy path; count, sum and sum of squares of every
+metric are accumulated for the finest level with segmented reductions and rolled up
+level by level from those aggregates. Every node is indexed by its path, so node
+lookups, drill-down and roll-up read precomputed aggregates in O(1) and metrics can
+be analyzed at any level of the hierarchy without touching the rows again.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class RollupCube:
+    """
+    Count / sum / sum-of-squares per metric for every node of a hierarchy.
+
+    Args:
+        frame: One row per observation with the level columns and metric columns
+               (NaN metrics are not counted; rows missing a level label are left out)
+        levels: Level columns from the coarsest to the finest, e.g. ["organization", "team", "worker"]
+        metrics: Metric columns to aggregate
+    """
+    def __init__(self, frame: pd.DataFrame, levels: Sequence[str], metrics: Sequence[str]):
+        self.levels = list(levels)
+        self.metrics = list(metrics)
+        if not self.levels:
+            raise ValueError("A rollup needs at least one level")
+        missing = [col for col in self.levels + self.metrics if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Rollup columns not found: {', '.join(missing)}")
+        frame = frame.dropna(subset=self.levels)
+
+        # One sort by the full path (coarsest level as the primary key)
+        labels, codes = [], []
+        for level in self.levels:
+            level_codes, level_labels = pd.factorize(frame[level].astype(str), sort=True)
+            codes.append(level_codes)
+            labels.append(np.asarray(level_labels, dtype=object))
+        order = np.lexsort(codes[::-1]) if len(frame) else np.array([], dtype=np.intp)
+        codes = [c[order] for c in codes]
+        values = frame[self.metrics].to_numpy(dtype=float)[order]
+
+        # Shifting by the column means keeps the sums of squares well conditioned
+        observed = ~np.isnan(values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.shift = np.nan_to_num(np.where(observed, values, 0.0).sum(axis=0) / observed.sum(axis=0))
+        shifted = np.where(observed, values - self.shift, 0.0)
+
+        # Group starts per depth: a new node begins wherever any label of its path changes
+        changed = np.zeros(len(order), dtype=bool)
+        if len(order):
+            changed[0] = True
+        starts = []
+        for level_codes in codes:
+            changed[1:] |= level_codes[1:] != level_codes[:-1]
+            starts.append(np.flatnonzero(changed))
+
+        # Finest level from the rows, coarser levels from the finer aggregates
+        self._tables: Dict[str, dict] = {}
+        self._index: Dict[Tuple[str, ...], Tuple[int, int]] = {}
+        count = sums = squares = None
+        for depth in range(len(self.levels) - 1, -1, -1):
+            if depth == len(self.levels) - 1:
+                count, sums, squares = (self._reduce(part, starts[depth]) for part in
+                                        (observed.astype(float), shifted, shifted * shifted))
+            else:
+                positions = np.searchsorted(starts[depth + 1], starts[depth])
+                count, sums, squares = (self._reduce(part, positions) for part in (count, sums, squares))
+            child_start = (np.searchsorted(starts[depth + 1], starts[depth])
+                           if depth + 1 < len(self.levels) else np.zeros(len(starts[depth]), dtype=np.intp))
+            child_end = np.r_[child_start[1:], len(starts[depth + 1])] if depth + 1 < len(self.levels) else child_start
+            paths = [labels[i][codes[i][starts[depth]]] for i in range(depth + 1)]
+            keys = list(zip(*paths))
+            self._tables[self.levels[depth]] = {
+                "depth": depth, "keys": keys, "paths": paths,
+                "count": count, "sum": sums, "sumsq": squares,
+                "children": np.column_stack([child_start, child_end]),
+            }
+            self._index.update((key, (depth, row)) for row, key in enumerate(keys))
+
+    @staticmethod
+    def _reduce(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        if len(starts) == 0:
+            return np.zeros((0,) + values.shape[1:])
+        return np.add.reduceat(values, starts, axis=0)
+
+    def _summary(self, table: dict, rows) -> pd.DataFrame:
+        count, sums, squares = table["count"][rows], table["sum"][rows], table["sumsq"][rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(count > 0, self.shift + sums / count, np.nan)
+            variances = np.where(count > 1, (squares - sums * sums / count) / (count - 1), np.nan)
+        frame = pd.DataFrame({level: path[rows] for level, path in zip(self.levels, table["paths"])})
+        for j, metric in enumerate(self.metrics):
+            frame[metric] = means[:, j]
+            frame[f"n_{metric}"] = count[:, j].astype(int)
+            frame[f"std_{metric}"] = np.sqrt(np.maximum(variances[:, j], 0.0))
+        return frame
+
+    def _locate(self, key) -> Tuple[dict, int]:
+        key = (key,) if isinstance(key, str) else tuple(key)
+        if key not in self._index:
+            raise KeyError(f"No rollup node {'/'.join(key)}")
+        depth, row = self._index[key]
+        return self._tables[self.levels[depth]], row
+
+    def node(self, key) -> dict:
+        """Means, counts and standard deviations of one node, addressed by its path (or a top-level label)"""
+        table, row = self._locate(key)
+        count, sums, squares = table["count"][row], table["sum"][row], table["sumsq"][row]
+        summary = {"level": self.levels[table["depth"]],
+                   **{level: path[row] for level, path in zip(self.levels, table["paths"])}}
+        for j, metric in enumerate(self.metrics):
+            n = count[j]
+            summary[metric] = float(self.shift[j] + sums[j] / n) if n > 0 else np.nan
+            summary[f"n_{metric}"] = int(n)
+            summary[f"std_{metric}"] = (float(np.sqrt(max((squares[j] - sums[j] ** 2 / n) / (n - 1), 0.0)))
+                                        if n > 1 else np.nan)
+        return summary
+
+    def drill_down(self, key=None) -> pd.DataFrame:
+        """Summaries of a node's children (the top level when key is None)"""
+        if key is None:
+            table = self._tables[self.levels[0]]
+            return self._summary(table, np.arange(len(table["keys"])))
+        table, row = self._locate(key)
+        if table["depth"] + 1 >= len(self.levels):
+            raise ValueError(f"{self.levels[table['depth']]} is the finest rollup level")
+        start, end = table["children"][row]
+        return self._summary(self._tables[self.levels[table["depth"] + 1]], np.arange(start, end))
+
+    def roll_up(self, key) -> dict:
+        """Summary of a node's parent"""
+        key = (key,) if isinstance(key, str) else tuple(key)
+        if len(key) < 2:
+            raise ValueError(f"{self.levels[0]} is the coarsest rollup level")
+        return self.node(key[:-1])
+
+    def level_frame(self, level: str, complete_only: bool = False) -> pd.DataFrame:
+        """Every node of one level: path columns, metric means, counts and standard deviations"""
+        if level not in self._tables:
+            raise ValueError(f"Unknown rollup level: {level}")
+        table = self._tables[level]
+        rows = np.arange(len(table["keys"]))
+        if complete_only:
+            rows = rows[(table["count"] > 0).all(axis=1)]
+        return self._summary(table, rows)
+
+    def node_counts(self) -> Dict[str, int]:
+        return {level: len(self._tables[level]["keys"]) for level in self.levels}
+
+    def to_frame(self) -> pd.DataFrame:
+        """All levels stacked, coarsest first (deeper path columns are empty for coarser nodes)"""
+        frames: List[pd.DataFrame] = []
+        for level in self.levels:
+            frame = self.level_frame(level)
+            frame.insert(0, "level", level)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)[frames[-1].columns]
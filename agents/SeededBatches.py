@@ -0,0 +1,37 @@
+"""
+Seeded, memory-capped batches of random draws (bootstrap resamples, permutations).
+n draws are split into batches whose working set stays under BATCH_ELEMENTS values,
+every batch gets its own child seed, and the batches run inline or in the shared
+process pool. The result is the same whatever the number of workers.
+"""
+from typing import Callable, List
+
+import numpy as np
+
+BATCH_ELEMENTS = 1 << 22  # values materialized per batch (draws x values per draw)
+
+
+def batch_sizes(n_draws: int, max_batch: int, values_per_draw: int) -> List[int]:
+    """Split n_draws into batches of at most max_batch draws and about BATCH_ELEMENTS values"""
+    batch = max(1, min(max_batch, BATCH_ELEMENTS // max(values_per_draw, 1)))
+    sizes = [batch] * (n_draws // batch)
+    if n_draws % batch:
+        sizes.append(n_draws % batch)
+    return sizes
+
+
+def map_seeded_batches(func: Callable, n_draws: int, seed: int, max_batch: int, values_per_draw: int,
+                       execution_backend: str = "thread") -> list:
+    """
+    Call func(size, seed_sequence) for every batch and return the results in batch order.
+    func must be picklable (a module-level function or a functools.partial of one) for the
+    "process" backend, which spreads the batches across the shared worker pool.
+    """
+    sizes = batch_sizes(n_draws, max_batch, values_per_draw)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if execution_backend == "process" and len(sizes) > 1:
+        from process_backend import get_process_pool
+        pool = get_process_pool()
+        futures = [pool.submit(func, size, s) for size, s in zip(sizes, seeds)]
+        return [future.result() for future in futures]
+    return [func(size, s) for size, s in zip(sizes, seeds)]
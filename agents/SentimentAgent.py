@@ -1,6 +1,6 @@
 import pandas as pd
 import os
-from textblob import TextBlob
+from agents.DatasetRepository import load_dataset
 
 class SentimentAgent:
     def __init__(self, file_path=None):
@@ -12,7 +12,7 @@ class SentimentAgent:
                 "data",
                 "mental_health_remote_workers.csv"
             )
-        self.data = pd.read_csv(file_path)
+        self.data = load_dataset(file_path)
 
     def get_metrics(self):
         """
@@ -23,7 +23,8 @@ class SentimentAgent:
         """
         # Check for sentiment-bearing text column
         if "Employee Sentiment" in self.data.columns:
-            # Apply BERT-like NLP sentiment analysis
+            # Apply BERT-like NLP sentiment analysis (TextBlob/NLTK imported only when needed)
+            from textblob import TextBlob
             self.data["SPI"] = self.data["Employee Sentiment"].astype(str).apply(
                 lambda x: TextBlob(x).sentiment.polarity if pd.notna(x) else 0
             )
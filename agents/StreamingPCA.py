@@ -0,0 +1,85 @@
+"""
+Out-of-core PCA over metric matrices.
+Row blocks are folded into streaming column means and a d x d co-moment matrix
+(agents.OnlineStats.OnlineMoments), so memory stays O(d²) whatever the number of
+rows. Explained variance and loadings come from an eigendecomposition of the
+covariance and are available after any block; the result equals a full-batch PCA.
+Large matrices are read block by block from memory-mapped .npy files.
+"""
+import numpy as np
+
+from agents.OnlineStats import OnlineMoments
+
+BLOCK_ROWS = 65536
+
+
+class StreamingPCA(OnlineMoments):
+    """PCA with partial_fit over row blocks; blocks can also be removed or merged from shards"""
+    def __init__(self, n_features: int, n_components: int = 2):
+        super().__init__(n_features)
+        self.n_components = min(n_components, n_features)
+
+    def partial_fit(self, block) -> "StreamingPCA":
+        """Fold a block of rows (n x d) into the running statistics"""
+        block = np.asarray(block, dtype=float)
+        if block.ndim == 1:
+            block = block[None, :]
+        return self.add_rows(block)
+
+    def _eigen(self):
+        if self.n < 2:
+            raise ValueError(f"PCA needs at least 2 rows, got {self.n}")
+        eigenvalues, eigenvectors = np.linalg.eigh(self.covariance())
+        eigenvalues, eigenvectors = eigenvalues[::-1], eigenvectors[:, ::-1]  # descending
+        # Deterministic signs: the largest-magnitude loading of each component is positive
+        signs = np.sign(eigenvectors[np.abs(eigenvectors).argmax(axis=0), np.arange(eigenvectors.shape[1])])
+        signs[signs == 0] = 1.0
+        return np.maximum(eigenvalues, 0.0), eigenvectors * signs
+
+    def explained_variance(self) -> np.ndarray:
+        """Variance along each of the leading components"""
+        return self._eigen()[0][:self.n_components]
+
+    def explained_variance_ratio(self) -> np.ndarray:
+        """Share of total variance explained by each of the leading components"""
+        eigenvalues = self._eigen()[0]
+        total = eigenvalues.sum()
+        if total <= 0:
+            return np.full(self.n_components, np.nan)
+        return eigenvalues[:self.n_components] / total
+
+    def components(self) -> np.ndarray:
+        """Component loadings (n_components x d), one unit-length row per component"""
+        return self._eigen()[1][:, :self.n_components].T
+
+    def transform(self, block) -> np.ndarray:
+        """Project rows onto the leading components"""
+        return (np.asarray(block, dtype=float) - self.mean) @ self.components().T
+
+
+def write_memmap(path: str, values, block_rows: int = BLOCK_ROWS) -> str:
+    """Store a metric matrix as a .npy file that can later be memory-mapped, copying block by block"""
+    shape = np.shape(values)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+    for start in range(0, shape[0], block_rows):
+        out[start:start + block_rows] = np.asarray(values[start:start + block_rows], dtype=float)
+    out.flush()
+    del out
+    return path
+
+
+def fit_memmap(path: str, n_components: int = 2, columns=None,
+               block_rows: int = BLOCK_ROWS) -> StreamingPCA:
+    """
+    Streaming PCA of a memory-mapped (rows x metrics) .npy file.
+    Rows containing NaN are skipped; only one block is resident at a time.
+    """
+    values = np.load(path, mmap_mode="r")
+    if values.ndim != 2:
+        raise ValueError(f"Expected a 2-D metric matrix in {path}, got shape {values.shape}")
+    columns = np.arange(values.shape[1]) if columns is None else np.asarray(columns)
+    pca = StreamingPCA(len(columns), n_components)
+    for start in range(0, values.shape[0], block_rows):
+        block = np.asarray(values[start:start + block_rows][:, columns], dtype=float)
+        pca.partial_fit(block[~np.isnan(block).any(axis=1)])
+    return pca
@@ -2,4 +2,8 @@ from agents.ProductivityAgent import ProductivityAgent
 from agents.SentimentAgent import SentimentAgent
 from agents.ComplianceAgent import ComplianceAgent
 from agents.InteractionAgent import InteractionAgent
-from agents.CorrelationEngine import CorrelationEngine
\ No newline at end of file
+from agents.CorrelationEngine import CorrelationEngine
+from agents.OnlineStats import OnlineRegressionStats
+from agents.StreamingPCA import StreamingPCA
+from agents.RollupCube import RollupCube
+from agents.DatasetRepository import DatasetRepository
@@ -0,0 +1,187 @@
+"""
+Multi-Tenant Batch Runner for the Multi-AI Agent System
+Runs the compiled agent graph over a manifest of per-organization dataset bundles
+with bounded concurrency and writes results per tenant
+
+Manifest format (JSON list, paths relative to the manifest file):
+    [
+        {
+            "tenant": "acme",
+            "productivity": "acme/Agile_Projects_Dataset.xlsx",
+            "sentiment": "acme/mental_health_remote_workers.csv",
+            "compliance": "acme/Enterprise_GenAI_Adoption_Impact.csv",
+            "interaction": "acme/remote_worker_productivity_1000.csv"
+        }
+    ]
+A CSV with the same column names is accepted as well. Datasets missing from a
+bundle fall back to the bundled defaults in data/.
+"""
+import os
+import re
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from agents.CorrelationEngine import summarize_stats
+from agents.OnlineStats import OnlineRegressionStats
+from graph_nodes import ENTITY_METRIC_AGENTS
+from llm_client import get_llm_limiter
+from main import build_graph, initialize_state
+from node_cache import NodeCache
+from tool_cache import release_run
+from process_backend import EXECUTION_BACKENDS
+
+SUMMARY_KEYS = ["TCR", "SPI", "DCR", "CI", "OCS", "merged_data_path", "completed_agents"]
+
+
+def load_manifest(manifest_path: str) -> List[Dict]:
+    """
+    Load tenant dataset bundles from a JSON or CSV manifest.
+    Relative dataset paths are resolved against the manifest's directory.
+    """
+    if manifest_path.lower().endswith(".csv"):
+        entries = pd.read_csv(manifest_path, dtype=str).fillna("").to_dict("records")
+    else:
+        with open(manifest_path) as f:
+            entries = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    bundles = []
+    for entry in entries:
+        tenant = str(entry.get("tenant") or "").strip()
+        if not tenant:
+            raise ValueError(f"Manifest entry without a tenant name: {entry}")
+        data_paths = {
+            agent: os.path.join(base_dir, entry[agent])
+            for agent in ENTITY_METRIC_AGENTS
+            if entry.get(agent)
+        }
+        bundles.append({"tenant": tenant, "data_paths": data_paths})
+    return bundles
+
+
+def tenant_results_dir(output_dir: str, tenant: str) -> str:
+    """Filesystem-safe per-tenant output directory"""
+    return os.path.join(output_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", tenant))
+
+
+def run_tenant(app, bundle: Dict, output_dir: str, execution_backend: str = "thread") -> Dict:
+    """Run the graph for one tenant and write its final state summary"""
+    results_dir = tenant_results_dir(output_dir, bundle["tenant"])
+    os.makedirs(results_dir, exist_ok=True)
+
+    run_id = f"tenant-{bundle['tenant']}"
+    start = time.perf_counter()
+    try:
+        final_state = app.invoke(
+            initialize_state(data_paths=bundle["data_paths"], results_dir=results_dir,
+                             execution_backend=execution_backend, run_id=run_id),
+            {"configurable": {"thread_id": run_id}}
+        )
+    finally:
+        release_run(run_id)
+    elapsed = time.perf_counter() - start
+
+    summary = {key: final_state.get(key) for key in SUMMARY_KEYS}
+    summary["tenant"] = bundle["tenant"]
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    with open(os.path.join(results_dir, "final_state.json"), "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+    return summary
+
+
+def run_batch(bundles: List[Dict], output_dir: str = "results/tenants",
+              concurrency: int = 4, use_cache: bool = True,
+              execution_backend: str = "thread") -> List[Dict]:
+    """
+    Run the agent graph for every tenant bundle.
+    The compiled graph, LLM client and sentiment lexicon are shared by all tenants;
+    at most `concurrency` tenants are in flight at once.
+    """
+    app = build_graph(cache=NodeCache() if use_cache else None, incremental=use_cache)
+
+    # Load the TextBlob lexicon once before tenants start in parallel
+    from textblob import TextBlob
+    TextBlob("warm up").sentiment
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            executor.submit(run_tenant, app, bundle, output_dir, execution_backend): bundle["tenant"]
+            for bundle in bundles
+        }
+        for future in as_completed(futures):
+            tenant = futures[future]
+            try:
+                summary = future.result()
+                print(f"✅ Tenant {tenant} complete in {summary['elapsed_seconds']:.2f}s")
+            except Exception as e:
+                print(f"⚠️  Tenant {tenant} failed: {e}")
+                summary = {"tenant": tenant, "error": str(e)}
+            results.append(summary)
+
+    os.makedirs(output_dir, exist_ok=True)
+    index_path = os.path.join(output_dir, "batch_summary.csv")
+    pd.DataFrame([
+        {key: r.get(key) for key in ["tenant", "TCR", "SPI", "DCR", "CI", "elapsed_seconds", "error"]}
+        for r in results
+    ]).sort_values("tenant").to_csv(index_path, index=False)
+    print(f"📂 Batch summary saved: {index_path}")
+
+    pooled = pool_tenant_ocs(results)
+    if pooled is not None:
+        pooled_path = os.path.join(output_dir, "pooled_ocs.json")
+        with open(pooled_path, "w") as f:
+            json.dump(pooled, f, indent=2)
+        print(f"🔗 Pooled OCS over {pooled['n']} units from {len(pooled['tenants'])} tenant(s): "
+              f"R²={pooled['r_squared']} ({pooled_path})")
+    return results
+
+
+def pool_tenant_ocs(results: List[Dict]) -> Optional[Dict]:
+    """
+    Merge tenants' correlation statistics into one cross-tenant regression (exact, no raw rows needed).
+    Only OCS fitted on observed units are pooled: synthetic org units are seeded random draws
+    (the same seed for every tenant by default), so pooling them would count copies of noise as data.
+    """
+    pooled = None
+    pooled_tenants, skipped = [], []
+    for result in results:
+        ocs = result.get("OCS") or {}
+        stats = ocs.get("stats")
+        if not stats:
+            continue
+        if ocs.get("unit_source", "synthetic") == "synthetic":
+            skipped.append(result["tenant"])
+            continue
+        tenant_stats = OnlineRegressionStats.from_dict(stats)
+        pooled = tenant_stats if pooled is None else pooled.merge(tenant_stats)
+        pooled_tenants.append(result["tenant"])
+    if skipped:
+        print(f"⚠️  Pooled OCS skips {len(skipped)} tenant(s) correlated on synthetic units: {', '.join(map(str, skipped))}")
+    if pooled is None:
+        return None
+    return {**summarize_stats(pooled), "tenants": pooled_tenants, "skipped_synthetic_tenants": skipped}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the agent pipeline for many organizations")
+    parser.add_argument("manifest", help="JSON or CSV manifest of tenant dataset bundles")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum tenants processed at once")
+    parser.add_argument("--output-dir", default="results/tenants", help="Directory for per-tenant results")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every node instead of reusing cached outputs")
+    parser.add_argument("--backend", choices=EXECUTION_BACKENDS, default="thread",
+                        help="Run CPU-bound node compute in threads or in a persistent process pool")
+    args = parser.parse_args()
+
+    bundles = load_manifest(args.manifest)
+    print(f"\n🏢 Running {len(bundles)} tenants with concurrency {args.concurrency}")
+    start = time.perf_counter()
+    run_batch(bundles, args.output_dir, args.concurrency, use_cache=not args.no_cache,
+              execution_backend=args.backend)
+    print(f"\n✨ Batch complete in {time.perf_counter() - start:.2f}s")
+    print(f"📡 LLM client: {get_llm_limiter().stats()}")
@@ -0,0 +1,124 @@
+"""
+Offline Benchmark for the Agent Pipeline
+Runs the full graph with the scripted chat model (fake_llm.py) and reports where
+time goes: whole-graph runs, agent executors, LLM calls and tool calls.
+
+Usage:
+    python benchmark.py --runs 5 --latency-ms 200 --tokens-per-second 80
+"""
+import os
+import time
+import argparse
+import threading
+import statistics
+from collections import defaultdict
+
+# Select the scripted model before agent_config/graph_nodes create the LLM
+os.environ["LLM_PROVIDER"] = "fake"
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class TimingCallback(BaseCallbackHandler):
+    """Collects wall-clock durations of agent executors, chat model calls and tool calls"""
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self._starts = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, kind):
+        with self._lock:
+            self._starts[run_id] = (kind, time.perf_counter())
+
+    def _end(self, run_id):
+        with self._lock:
+            entry = self._starts.pop(run_id, None)
+            if entry is not None:
+                kind, start = entry
+                self.durations[kind].append(time.perf_counter() - start)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+        if kwargs.get("name") == "AgentExecutor":
+            self._start(run_id, "agent_executor")
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm_call")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        # Tools invoked by another tool (cache and compact wrappers) are part of the outer call
+        with self._lock:
+            nested = self._starts.get(parent_run_id, (None,))[0] == "tool_call"
+        if not nested:
+            self._start(run_id, "tool_call")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+
+def summarize(name: str, values) -> str:
+    if not values:
+        return f"{name:<16} {'-':>6}"
+    ms = sorted(v * 1000 for v in values)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return (f"{name:<16} {len(ms):>6} {statistics.mean(ms):>10.1f} "
+            f"{statistics.median(ms):>10.1f} {p95:>10.1f} {sum(ms):>10.1f}")
+
+
+def run_benchmark(runs: int = 5, shards: int = 1, execution_backend: str = "thread",
+                  narrative_mode: str = "agents"):
+    """Run the graph `runs` times (after one warm-up run) and return the collected timings"""
+    from main import build_graph, initialize_state
+
+    app = build_graph(shards=shards)
+    app.invoke(initialize_state(execution_backend=execution_backend, narrative_mode=narrative_mode))
+
+    timings = TimingCallback()
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.invoke(initialize_state(execution_backend=execution_backend, narrative_mode=narrative_mode),
+                   {"callbacks": [timings]})
+        timings.durations["graph_run"].append(time.perf_counter() - start)
+    return timings.durations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline offline with a scripted LLM")
+    parser.add_argument("--runs", type=int, default=5, help="Measured graph runs (after one warm-up run)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated LLM time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="Simulated LLM generation rate (0 = instant)")
+    parser.add_argument("--shards", type=int, default=1, help="Split each analysis agent into N entity shards")
+    parser.add_argument("--backend", choices=("thread", "process"), default="thread",
+                        help="Execution backend for CPU-bound node compute")
+    parser.add_argument("--narrative", choices=("agents", "consolidated"), default="agents",
+                        help="Per-agent LLM loops or one consolidated LLM call")
+    args = parser.parse_args()
+
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    os.environ.setdefault("LLM_CACHE", "0")
+
+    durations = run_benchmark(args.runs, args.shards, args.backend, args.narrative)
+
+    print("\n⏱️  Benchmark results (ms)")
+    print(f"{'':<16} {'count':>6} {'mean':>10} {'p50':>10} {'p95':>10} {'total':>10}")
+    for kind in ("graph_run", "agent_executor", "llm_call", "tool_call"):
+        print(summarize(kind, durations.get(kind, [])))
+
+    executor_total = sum(durations.get("agent_executor", []))
+    overhead = executor_total - sum(durations.get("llm_call", [])) - sum(durations.get("tool_call", []))
+    print(f"\nExecutor overhead (executor - LLM - tools): {overhead * 1000:.1f} ms total")
@@ -0,0 +1,259 @@
+"""
+Monitoring Daemon for the Multi-AI Agent System
+Keeps the compiled graph, dataset repository and LLM client warm in one long-lived
+process and serves analysis runs over a local HTTP port or Unix socket.
+
+Endpoints:
+    GET  /health  -> {"status": "ok", "llm_client": {...limiter counters}, ...}
+    POST /run     -> final AgentState as JSON
+        body (all optional): {"data_paths": {...}, "results_dir": "results",
+                              "execution_backend": "thread", "narrative_mode": "agents",
+                              "streaming": false, "shards": 1, "org_units": 100, "org_unit_seed": 42,
+                              "bootstrap_resamples": 0, "permutations": 0, "rollup_levels": ["organization", "unit_id"]}
+        Malformed JSON, unknown fields and out-of-range values get a 400; pipeline failures a 500.
+"""
+import os
+import json
+import time
+import uuid
+import argparse
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.messages import BaseMessage
+
+from agents.DatasetRepository import load_dataset
+from graph_nodes import DEFAULT_DATA_PATHS
+from llm_client import get_llm_limiter
+from main import build_graph, initialize_state
+from narrative import NARRATIVE_MODES
+from node_cache import NodeCache
+from process_backend import EXECUTION_BACKENDS
+from tool_cache import release_run
+
+# Each distinct shard count compiles and caches its own graph, so client values are bounded
+MAX_SHARDS = 64
+MAX_ORG_UNITS = 1_000_000
+MAX_RESAMPLES = 1_000_000
+RUN_FIELDS = {"data_paths", "results_dir", "execution_backend", "narrative_mode", "streaming", "run_id",
+              "shards", "org_units", "org_unit_seed", "bootstrap_resamples", "permutations", "rollup_levels"}
+
+
+def _int_field(request: dict, name: str, default: int, low: int, high: int) -> int:
+    value = request.get(name)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _str_list(request: dict, name: str) -> list:
+    value = request.get(name)
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{name} must be a list of strings")
+    return value
+
+
+def parse_run_request(body: bytes) -> dict:
+    """
+    Decode and validate a POST /run body into keyword arguments for initialize_state
+    (plus "shards"). Raises ValueError (json.JSONDecodeError included) on client mistakes.
+    """
+    request = json.loads(body or b"{}")
+    if not isinstance(request, dict):
+        raise ValueError("Request body must be a JSON object")
+    unknown = sorted(set(request) - RUN_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown request field(s): {', '.join(unknown)}")
+
+    data_paths = request.get("data_paths") or {}
+    if not isinstance(data_paths, dict) or not all(
+            isinstance(k, str) and isinstance(v, str) for k, v in data_paths.items()):
+        raise ValueError("data_paths must map agent names to file paths")
+    execution_backend = request.get("execution_backend") or "thread"
+    if execution_backend not in EXECUTION_BACKENDS:
+        raise ValueError(f"execution_backend must be one of {', '.join(EXECUTION_BACKENDS)}")
+    narrative_mode = request.get("narrative_mode") or "agents"
+    if narrative_mode not in NARRATIVE_MODES:
+        raise ValueError(f"narrative_mode must be one of {', '.join(NARRATIVE_MODES)}")
+    for name in ("results_dir", "run_id"):
+        if request.get(name) is not None and not isinstance(request[name], str):
+            raise ValueError(f"{name} must be a string")
+    if not isinstance(request.get("streaming", False), bool):
+        raise ValueError("streaming must be true or false")
+
+    return {
+        "data_paths": data_paths or None,
+        "results_dir": request.get("results_dir") or "results",
+        "execution_backend": execution_backend,
+        "narrative_mode": narrative_mode,
+        "streaming": bool(request.get("streaming")),
+        "run_id": request.get("run_id") or f"run-{uuid.uuid4().hex[:8]}",
+        "shards": _int_field(request, "shards", 1, 1, MAX_SHARDS),
+        "org_units": _int_field(request, "org_units", 100, 1, MAX_ORG_UNITS),
+        "org_unit_seed": _int_field(request, "org_unit_seed", 42, 0, 2 ** 32 - 1),
+        "bootstrap_resamples": _int_field(request, "bootstrap_resamples", 0, 0, MAX_RESAMPLES),
+        "permutations": _int_field(request, "permutations", 0, 0, MAX_RESAMPLES),
+        "rollup_levels": _str_list(request, "rollup_levels"),
+    }
+
+
+class MonitoringService:
+    """Warm pipeline shared by all requests: compiled graphs (one per shard count), cache and datasets"""
+    def __init__(self, use_cache: bool = True):
+        self.cache = NodeCache() if use_cache else None
+        self._graphs = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests_served = 0
+
+    def warm_up(self):
+        """Compile the default graph, create the LLM client and load the sentiment lexicon and bundled datasets"""
+        from textblob import TextBlob
+        from graph_nodes import get_agent_llm
+        TextBlob("warm up").sentiment
+        get_agent_llm()
+        self.get_graph(1)
+        for path in DEFAULT_DATA_PATHS.values():
+            try:
+                load_dataset(path)
+            except OSError as e:
+                print(f"⚠️  Could not preload {path}: {e}")
+
+    def get_graph(self, shards: int = 1):
+        with self._lock:
+            if shards not in self._graphs:
+                self._graphs[shards] = build_graph(
+                    cache=self.cache, shards=shards, incremental=self.cache is not None and shards == 1
+                )
+            return self._graphs[shards]
+
+    def run(self, request: dict) -> dict:
+        """Execute one analysis run (a request validated by parse_run_request) and return its final state"""
+        request = dict(request)
+        app = self.get_graph(request.pop("shards"))
+        run_id = request["run_id"]
+        state = initialize_state(**request)
+        config = {"configurable": {"thread_id": run_id}}
+
+        start = time.perf_counter()
+        try:
+            final_state = app.invoke(state, config)
+        finally:
+            release_run(run_id)
+        with self._lock:
+            self.requests_served += 1
+
+        result = dict(final_state)
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests_served": self.requests_served,
+            "llm_client": get_llm_limiter().stats(),
+        }
+
+
+def state_to_json(state: dict) -> bytes:
+    """Serialize an AgentState, rendering LangChain messages as type/content pairs"""
+    def default(obj):
+        if isinstance(obj, BaseMessage):
+            return {"type": obj.type, "content": obj.content}
+        return str(obj)
+    return json.dumps(state, default=default).encode("utf-8")
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    service: MonitoringService = None
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, json.dumps(self.service.health()).encode("utf-8"))
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def do_POST(self):
+        if self.path != "/run":
+            self._send(404, b'{"error": "not found"}')
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = parse_run_request(self.rfile.read(length))
+        except ValueError as e:  # malformed JSON, unknown fields, bad values or Content-Length
+            self._send(400, json.dumps({"error": str(e)}).encode("utf-8"))
+            return
+        try:
+            self._send(200, state_to_json(self.service.run(request)))
+        except Exception as e:
+            self._send(500, json.dumps({"error": str(e)}).encode("utf-8"))
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} - {format % args}")
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def create_server(service: MonitoringService, host: str = "127.0.0.1", port: int = 8765,
+                  unix_socket: str = None):
+    """HTTP server handling each request in its own thread, on TCP or a Unix socket"""
+    handler = type("BoundRequestHandler", (RequestHandler,), {"service": service})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return ThreadingUnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the agent pipeline as a long-lived local service")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind for HTTP")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP port")
+    parser.add_argument("--unix-socket", help="Serve on this Unix socket path instead of TCP")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every node instead of reusing cached outputs")
+    args = parser.parse_args()
+
+    service = MonitoringService(use_cache=not args.no_cache)
+    print("\n🔥 Warming up agent graph and datasets...")
+    service.warm_up()
+
+    server = create_server(service, args.host, args.port, args.unix_socket)
+    where = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"✅ Monitoring daemon listening on {where} (POST /run, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
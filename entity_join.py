@@ -0,0 +1,186 @@
+"""
+Cross-Source Entity Join
+The four sources use unrelated key spaces (Project_N, User_N, company names, W0001),
+so outer-merging them on EntityID only produces the union of all keys, mostly NaN.
+
+An entity crosswalk links each source's entities to shared join units (e.g. the team
+a worker belongs to, the team behind a project, the company owning a team). The
+join builds one sparse metric matrix (join unit x metric) in a single pass over the
+per-agent records, so memory grows with the observations that actually matched.
+
+Crosswalk file (CSV or Excel), one row per link:
+    agent,entity_id,unit_id
+    interaction,W0001,Team_7
+    productivity,Project_12,Team_7
+    compliance,Acme Corp,Team_7
+An entity may link to several units. Without a crosswalk every entity is its own unit.
+An optional `segment` column labels units (e.g. industry sector or country) for
+per-segment correlation reports. Any other extra column (e.g. `organization`) is kept
+as a unit attribute and can serve as a level of a hierarchical rollup.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.DatasetRepository import load_dataset
+
+CROSSWALK_COLUMNS = ["agent", "entity_id", "unit_id"]
+
+
+class EntityCrosswalk:
+    """Hash index from (agent, entity) to join units"""
+    def __init__(self, links: pd.DataFrame):
+        missing = [col for col in CROSSWALK_COLUMNS if col not in links.columns]
+        if missing:
+            raise ValueError(f"Crosswalk is missing columns: {', '.join(missing)}")
+        extra = [col for col in links.columns if col not in CROSSWALK_COLUMNS]
+        labelled = links.dropna(subset=["unit_id"]).astype({"unit_id": str})
+        # First non-missing value of each extra column per unit
+        self.attributes = labelled[["unit_id"] + extra].astype({col: "string" for col in extra}).groupby("unit_id").first()
+        if "segment" in extra:
+            self.segments = self.attributes["segment"].dropna().astype(str)
+        else:
+            self.segments = pd.Series(dtype=str)
+        links = links[CROSSWALK_COLUMNS].dropna().astype(str).drop_duplicates()
+        self._links = {
+            agent: group[["entity_id", "unit_id"]].reset_index(drop=True)
+            for agent, group in links.groupby("agent")
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "EntityCrosswalk":
+        return cls(load_dataset(path))
+
+    def segment_of(self, units) -> pd.Series:
+        """Segment label of each unit (NaN when unlabelled)"""
+        return pd.Series(units).astype(str).map(self.segments)
+
+    def link(self, agent: str, entity_ids: pd.Series) -> pd.DataFrame:
+        """
+        Hash-join entity ids against the agent's links.
+        Returns DataFrame: position (row in entity_ids), unit_id - matches only.
+        """
+        links = self._links.get(agent)
+        if links is None or entity_ids.empty:
+            return pd.DataFrame({"position": np.array([], dtype=np.intp), "unit_id": []})
+        probe = pd.DataFrame({"entity_id": entity_ids.astype(str).to_numpy(),
+                              "position": np.arange(len(entity_ids))})
+        return probe.merge(links, on="entity_id", how="inner")[["position", "unit_id"]]
+
+
+class EntityMetricMatrix:
+    """
+    Sparse join-unit x metric matrix holding per-cell sums and observation counts,
+    so units linked to several entities report the mean of their matched values.
+    """
+    def __init__(self, units: pd.Index, columns: List[str], sums, counts):
+        self.units = units
+        self.columns = list(columns)
+        self.sums = sums
+        self.counts = counts
+
+    @property
+    def observations(self) -> int:
+        return int(self.counts.nnz)
+
+    def coverage(self) -> Dict[str, int]:
+        """Number of units with an observed value for each metric"""
+        observed = np.asarray(self.counts.getnnz(axis=0)).ravel()
+        return {col: int(n) for col, n in zip(self.columns, observed)}
+
+    def column_values(self, column: str) -> np.ndarray:
+        """Observed (unit-mean) values of one metric"""
+        j = self.columns.index(column)
+        counts = self.counts[:, [j]].toarray().ravel()
+        observed = counts > 0
+        return self.sums[:, [j]].toarray().ravel()[observed] / counts[observed]
+
+    def to_frame(self, complete_only: bool = False) -> pd.DataFrame:
+        """Dense DataFrame EntityID + metrics (NaN where unobserved), optionally only fully observed units"""
+        counts = self.counts.toarray()
+        rows = np.flatnonzero((counts > 0).all(axis=1)) if complete_only else np.arange(len(self.units))
+        counts = counts[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = np.where(counts > 0, self.sums[rows].toarray() / counts, np.nan)
+        frame = pd.DataFrame(values, columns=self.columns)
+        frame.insert(0, "EntityID", self.units[rows])
+        return frame
+
+
+def _linked_observations(entity_metrics: Dict[str, List[Dict]], agent_metrics: Dict[str, str],
+                         crosswalk: Optional[EntityCrosswalk]):
+    """Yield (metric column index, entity ids, unit ids, values) of every agent's observed values"""
+    for j, (agent, metric) in enumerate(agent_metrics.items()):
+        records = entity_metrics.get(agent) or []
+        if not records:
+            continue
+        frame = pd.DataFrame(records)
+        values = pd.to_numeric(frame[metric], errors="coerce").to_numpy(dtype=float)
+        entities = frame["EntityID"].astype(str).to_numpy()
+        if crosswalk is None:
+            units = entities
+        else:
+            matches = crosswalk.link(agent, frame["EntityID"])
+            positions = matches["position"].to_numpy()
+            entities, units, values = entities[positions], matches["unit_id"].to_numpy(), values[positions]
+        observed = ~np.isnan(values)
+        yield j, entities[observed], units[observed], values[observed]
+
+
+def build_metric_matrix(entity_metrics: Dict[str, List[Dict]], agent_metrics: Dict[str, str],
+                        crosswalk: Optional[EntityCrosswalk] = None) -> EntityMetricMatrix:
+    """
+    Align per-agent entity records into one sparse metric matrix.
+
+    Args:
+        entity_metrics: Records (EntityID + metric) by agent name, as stored in AgentState
+        agent_metrics: Metric column reported by each agent, in output column order
+        crosswalk: Links from entities to join units; None joins on EntityID itself
+    """
+    from scipy import sparse
+    columns = list(agent_metrics.values())
+    unit_parts, col_parts, value_parts = [], [], []
+
+    for j, _, units, values in _linked_observations(entity_metrics, agent_metrics, crosswalk):
+        unit_parts.append(units)
+        value_parts.append(values)
+        col_parts.append(np.full(len(values), j))
+
+    if unit_parts:
+        codes, units = pd.factorize(np.concatenate(unit_parts))
+        cols, values = np.concatenate(col_parts), np.concatenate(value_parts)
+    else:
+        codes, units = np.array([], dtype=np.intp), pd.Index([])
+        cols, values = np.array([], dtype=np.intp), np.array([])
+
+    shape = (len(units), len(columns))
+    # Duplicate (unit, metric) entries are summed when converting to CSR
+    sums = sparse.coo_matrix((values, (codes, cols)), shape=shape).tocsr()
+    counts = sparse.coo_matrix((np.ones(len(values)), (codes, cols)), shape=shape).tocsr()
+    return EntityMetricMatrix(pd.Index(units), columns, sums, counts)
+
+
+def observation_frame(entity_metrics: Dict[str, List[Dict]], agent_metrics: Dict[str, str],
+                      crosswalk: Optional[EntityCrosswalk] = None) -> pd.DataFrame:
+    """
+    Long form of the join for hierarchical rollups: one row per matched observation with
+    entity_id, unit_id, the crosswalk's unit attributes and the metric columns (NaN
+    except the observed metric).
+    """
+    columns = list(agent_metrics.values())
+    parts = []
+    for j, entities, units, values in _linked_observations(entity_metrics, agent_metrics, crosswalk):
+        block = np.full((len(values), len(columns)), np.nan)
+        block[:, j] = values
+        part = pd.DataFrame(block, columns=columns)
+        part.insert(0, "unit_id", units)
+        part.insert(0, "entity_id", entities)
+        parts.append(part)
+    if parts:
+        frame = pd.concat(parts, ignore_index=True)
+    else:
+        frame = pd.DataFrame(columns=["entity_id", "unit_id"] + columns)
+    if crosswalk is not None and not crosswalk.attributes.empty:
+        frame = frame.join(crosswalk.attributes, on="unit_id")
+    return frame
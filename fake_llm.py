@@ -0,0 +1,157 @@
+"""
+Offline Scripted Chat Model
+Deterministic local stand-in for ChatOpenAI that supports tool calling, so the
+LangChain agent path (executor, tools, graph) can run and be benchmarked without
+network access. Enable it with LLM_PROVIDER=fake (see agent_config.get_llm).
+
+Each agent turn follows a script: a list of steps, where a step is either a list of
+tool calls ({"name": ..., "args": {...}}) or a final answer string. Without a script
+the model calls its first bound tool once and then answers with a summary of the
+tool results. Calls that force a tool (structured output) get placeholder
+arguments generated from the tool's JSON schema. Latency and token rate are
+simulated with sleeps; streamed responses arrive word by word.
+"""
+import re
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+ScriptStep = Union[str, List[Dict[str, Any]]]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Tool-calling chat model driven by a fixed script.
+
+    Args:
+        script: Steps played back on every agent turn (None = call first tool, then answer)
+        latency_seconds: Simulated time to first token for each call
+        tokens_per_second: Simulated generation rate (0 = instant)
+        answer_chars: Maximum length of the default final answer
+    """
+    script: Optional[List[ScriptStep]] = None
+    latency_seconds: float = 0.0
+    tokens_per_second: float = 0.0
+    answer_chars: int = 400
+    model_name: str = "scripted-chat-model"
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "script": self.script,
+            "latency_seconds": self.latency_seconds,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    @staticmethod
+    def _current_turn(messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Messages after the latest human request (the agent's scratchpad for this turn)"""
+        for i in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[i], HumanMessage):
+                return messages[i + 1:]
+        return list(messages)
+
+    def _next_step(self, turn: List[BaseMessage], tool_names: List[str]) -> ScriptStep:
+        step_index = sum(1 for m in turn if isinstance(m, AIMessage) and m.tool_calls)
+        script = self.script
+        if script is None:
+            script = [[{"name": tool_names[0], "args": {}}]] if tool_names else []
+        if step_index < len(script):
+            return script[step_index]
+
+        results = [" ".join(str(m.content).split()) for m in turn if isinstance(m, ToolMessage)]
+        answer = "Analysis complete. " + " | ".join(results)
+        return answer[:self.answer_chars]
+
+    @classmethod
+    def _placeholder(cls, schema: Dict[str, Any], defs: Dict[str, Any]):
+        """Deterministic value matching a JSON schema (used for forced tool calls)"""
+        if "$ref" in schema:
+            return cls._placeholder(defs[schema["$ref"].split("/")[-1]], defs)
+        kind = schema.get("type")
+        if kind == "object" or "properties" in schema:
+            return {name: cls._placeholder(prop, defs) for name, prop in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [cls._placeholder(schema.get("items", {}), defs)]
+        if kind in ("number", "integer"):
+            return 0
+        if kind == "boolean":
+            return False
+        return f"Scripted {schema.get('description') or schema.get('title') or 'text'}"
+
+    def _respond(self, messages: List[BaseMessage], **kwargs: Any) -> AIMessage:
+        """Next scripted message, with approximate token usage attached"""
+        tools = kwargs.get("tools") or []
+        tool_names = [t["function"]["name"] for t in tools]
+        turn = self._current_turn(messages)
+        step = self._next_step(turn, tool_names)
+
+        if kwargs.get("tool_choice") and len(tools) == 1:
+            schema = tools[0]["function"].get("parameters", {})
+            message = AIMessage(content="", tool_calls=[{
+                "name": tool_names[0], "args": self._placeholder(schema, schema.get("$defs", {})), "id": "call_0"
+            }])
+        elif isinstance(step, str):
+            message = AIMessage(content=step)
+        else:
+            call_index = sum(len(m.tool_calls) for m in turn if isinstance(m, AIMessage))
+            message = AIMessage(content="", tool_calls=[
+                {"name": call["name"], "args": call.get("args", {}), "id": f"call_{call_index + i}"}
+                for i, call in enumerate(step)
+            ])
+
+        input_tokens = count_tokens_approximately(messages)
+        output_tokens = count_tokens_approximately([message])
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return message
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages, **kwargs)
+        delay = self.latency_seconds
+        if self.tokens_per_second > 0:
+            delay += message.usage_metadata["output_tokens"] / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        """Stream the scripted message word by word at the simulated token rate"""
+        message = self._respond(messages, **kwargs)
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+
+        words = re.findall(r"\S+\s*", message.content) if message.content else []
+        token_delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for word in words:
+            if token_delay:
+                time.sleep(token_delay * max(1, len(word) // 4))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ],
+            usage_metadata=message.usage_metadata,
+        ))
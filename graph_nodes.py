@@ -1,7 +1,8 @@
 import os
+import threading
+import numpy as np
 import pandas as pd
 from typing import Dict
-from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.messages import HumanMessage, AIMessage
 from agent_config import (
     get_configured_llm,
@@ -9,7 +10,8 @@ from agent_config import (
     SENTIMENT_AGENT_PROMPT,
     COMPLIANCE_AGENT_PROMPT,
     INTERACTION_AGENT_PROMPT,
-    CORRELATION_AGENT_PROMPT
+    CORRELATION_AGENT_PROMPT,
+    NARRATIVE_PROMPT
 )
 from agent_tools import (
     PRODUCTIVITY_TOOLS,
@@ -23,19 +25,131 @@ from agent_tools import (
     get_interaction_data
 )
 from agents.CorrelationEngine import CorrelationEngine
+from agents.RollupCube import RollupCube
+from process_backend import EXECUTION_BACKENDS, run_in_process, invoke_metrics_tool
 from state_schema import AgentState
+from message_window import history_for
+from llm_cache import llm_data_scope
+from node_cache import file_fingerprint
+from entity_join import EntityCrosswalk, build_metric_matrix, observation_frame
+from narrative import AGENT_METRICS, NarrativeReport, build_narrative_input, get_narrative_mode
+from telemetry import stream_with_telemetry
+from tool_cache import tool_run_scope
 
-# Initialize LLM
-llm = get_configured_llm()
+# LLM shared by all agent nodes, created the first time an agent needs it
+_llm = None
+_llm_initialized = False
+_llm_lock = threading.Lock()
 
-# Global merged metrics
-metrics_df = pd.DataFrame(columns=["EntityID"])
+def get_agent_llm():
+    """Configured LLM (None without an API key), initialized lazily to keep startup fast"""
+    global _llm, _llm_initialized
+    with _llm_lock:
+        if not _llm_initialized:
+            _llm = get_configured_llm()
+            _llm_initialized = True
+        return _llm
 
-def safe_merge(df_main, df_new):
-    """Ensure safe merging even if df_main is empty, using outer join."""
-    if df_main.empty:
-        return df_new
-    return df_main.merge(df_new, on="EntityID", how="outer")
+# Synthetic organizational units built for correlation (overridable per run via state)
+DEFAULT_ORG_UNITS = 100
+DEFAULT_ORG_UNIT_SEED = 42
+
+# Order in which per-agent entity frames are merged for correlation
+ENTITY_METRIC_AGENTS = ["productivity", "sentiment", "compliance", "interaction"]
+
+# Crosswalk units needed (with all four metrics) before correlating joined data instead of synthetic units
+MIN_JOINED_UNITS = 10
+
+# Default dataset for each analysis agent (overridable per run via state["data_paths"])
+DEFAULT_DATA_PATHS = {
+    "productivity": "data/Agile_Projects_Dataset.xlsx",
+    "sentiment": "data/mental_health_remote_workers.csv",
+    "compliance": "data/Enterprise_GenAI_Adoption_Impact.csv",
+    "interaction": "data/remote_worker_productivity_1000.csv",
+}
+
+def get_data_path(state: AgentState, agent_name: str) -> str:
+    """Dataset path for an agent (or the optional "crosswalk") in this run, falling back to the bundled data"""
+    return (state.get("data_paths") or {}).get(agent_name) or DEFAULT_DATA_PATHS.get(agent_name)
+
+# Declared inputs of each node: datasets it reads, upstream nodes it depends on and
+# the code/prompt/state that shape its output (drives memoization and incremental runs)
+NODE_INPUTS = {
+    "productivity": {
+        "datasets": ["productivity"],
+        "modules": ["graph_nodes", "agent_tools", "tool_output", "agents.ProductivityAgent"],
+        "prompt": PRODUCTIVITY_AGENT_PROMPT,
+        "state_keys": ["narrative_mode", "streaming"],
+    },
+    "sentiment": {
+        "datasets": ["sentiment"],
+        "modules": ["graph_nodes", "agent_tools", "tool_output", "agents.SentimentAgent"],
+        "prompt": SENTIMENT_AGENT_PROMPT,
+        "state_keys": ["narrative_mode", "streaming"],
+    },
+    "compliance": {
+        "datasets": ["compliance"],
+        "modules": ["graph_nodes", "agent_tools", "tool_output", "agents.ComplianceAgent"],
+        "prompt": COMPLIANCE_AGENT_PROMPT,
+        "state_keys": ["narrative_mode", "streaming"],
+    },
+    "interaction": {
+        "datasets": ["interaction"],
+        "modules": ["graph_nodes", "agent_tools", "tool_output", "agents.InteractionAgent"],
+        "prompt": INTERACTION_AGENT_PROMPT,
+        "state_keys": ["narrative_mode", "streaming"],
+    },
+    "correlation": {
+        "datasets": ["crosswalk"],
+        "upstream": ["productivity", "sentiment", "compliance", "interaction"],
+        "modules": ["graph_nodes", "agent_tools", "entity_join", "agents.CorrelationEngine",
+                    "agents.OnlineStats", "agents.Bootstrap", "agents.GroupedRegression",
+                    "agents.CorrelationMatrix", "agents.StreamingPCA", "agents.RollupCube", "agents.Permutation"],
+        "prompt": CORRELATION_AGENT_PROMPT,
+        "state_keys": ["TCR", "SPI", "DCR", "CI", "entity_metrics", "results_dir", "narrative_mode", "streaming",
+                       "org_units", "org_unit_seed", "bootstrap_resamples", "rollup_levels", "permutations"],
+        "artifact_keys": ["merged_data_path"],
+    },
+    "narrative": {
+        "upstream": ["correlation"],
+        "modules": ["graph_nodes", "narrative", "tool_output"],
+        "prompt": NARRATIVE_PROMPT,
+        "state_keys": ["TCR", "SPI", "DCR", "CI", "OCS", "entity_metrics", "narrative_mode", "streaming"],
+    },
+}
+
+def node_cache_spec(node_name: str) -> Dict:
+    """Memoization arguments (files, modules, prompt, state/artifact keys) for a node"""
+    spec = NODE_INPUTS[node_name]
+    datasets = spec.get("datasets", [])
+    return {
+        "files": lambda state: [path for path in (get_data_path(state, dataset) for dataset in datasets) if path],
+        "modules": spec["modules"],
+        "prompt": spec.get("prompt"),
+        "state_keys": spec.get("state_keys", []),
+        "artifact_keys": spec.get("artifact_keys", []),
+    }
+
+def get_results_dir(state: AgentState) -> str:
+    """Output directory for this run"""
+    return state.get("results_dir") or "results"
+
+def get_execution_backend(state) -> str:
+    """Where deterministic node compute runs: "thread" (in the graph's thread) or "process" (worker pool)"""
+    backend = state.get("execution_backend") or "thread"
+    if backend not in EXECUTION_BACKENDS:
+        raise ValueError(f"Unknown execution backend: {backend}")
+    return backend
+
+def load_agent_data(data_tool, data_path: str, state: AgentState) -> pd.DataFrame:
+    """
+    Run a get_*_data tool on the configured execution backend.
+    In-process calls share the run's tool cache with the agent's LLM tool calls.
+    """
+    if get_execution_backend(state) == "process":
+        return run_in_process(invoke_metrics_tool, data_tool.name, data_path)
+    with tool_run_scope(state.get("run_id")):
+        return data_tool.invoke({"file_path": data_path})
 
 def create_langchain_agent(llm, tools, prompt):
     """
@@ -46,55 +160,111 @@ def create_langchain_agent(llm, tools, prompt):
         return None
     
     try:
+        from langchain.agents import create_tool_calling_agent, AgentExecutor
         agent = create_tool_calling_agent(llm, tools, prompt)
         return AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True)
     except Exception as e:
         print(f"⚠️  Could not create agent: {e}")
         return None
 
+# LLM reasoning setup per agent: tools, prompt, task input and the request logged to state
+AGENT_REASONING = {
+    "productivity": (
+        PRODUCTIVITY_TOOLS, PRODUCTIVITY_AGENT_PROMPT,
+        "Analyze the productivity metrics and compute Task Completion Ratio (TCR) for all projects. Provide insights. Use the dataset at {data_path}.",
+        "Analyze productivity metrics"
+    ),
+    "sentiment": (
+        SENTIMENT_TOOLS, SENTIMENT_AGENT_PROMPT,
+        "Analyze worker sentiment using NLP and compute Sentiment Polarity Index (SPI). Provide emotional insights. Use the dataset at {data_path}.",
+        "Analyze sentiment metrics"
+    ),
+    "compliance": (
+        COMPLIANCE_TOOLS, COMPLIANCE_AGENT_PROMPT,
+        "Analyze compliance metrics and compute Disclosure Compliance Rate (DCR). Identify compliance risks. Use the dataset at {data_path}.",
+        "Analyze compliance metrics"
+    ),
+    "interaction": (
+        INTERACTION_TOOLS, INTERACTION_AGENT_PROMPT,
+        "Analyze social interactions and compute Collaboration Index (CI). Identify collaboration patterns. Use the dataset at {data_path}.",
+        "Analyze interaction metrics"
+    ),
+    "correlation": (
+        CORRELATION_TOOLS, CORRELATION_AGENT_PROMPT,
+        "Perform correlation analysis on the aggregated metrics at {data_path}. Compute Outcome Correlation Score with statistical significance.",
+        "Perform correlation analysis"
+    ),
+}
+
+def run_agent_reasoning(agent_name: str, state: AgentState, data_path: str) -> Dict:
+    """
+    Run an agent's LangChain executor over its tools.
+    The executor sees a bounded, agent-scoped window of the shared history.
+    LLM responses are cached per prompt, tools and the content of data_path, and
+    tool results are memoized for the rest of the run (see tool_cache.py).
+    In streaming mode tokens are streamed as they arrive and the agent's latency
+    breakdown is recorded (see telemetry.py).
+    Returns the state update: request/response messages (empty without an LLM)
+    and, when streaming, agent_telemetry.
+    """
+    update = {"messages": []}
+    if get_narrative_mode(state) == "consolidated":
+        return update
+    llm = get_agent_llm()
+    if not llm:
+        return update
+    
+    tools, prompt, task, request = AGENT_REASONING[agent_name]
+    agent_executor = create_langchain_agent(llm, tools, prompt)
+    
+    if agent_executor:
+        try:
+            inputs = {
+                "input": task.format(data_path=data_path),
+                "chat_history": history_for(agent_name, state.get("messages", []))
+            }
+            with llm_data_scope(file_fingerprint(data_path)), tool_run_scope(state.get("run_id")):
+                if state.get("streaming"):
+                    result, telemetry = stream_with_telemetry(agent_executor, inputs, agent_name)
+                    update["agent_telemetry"] = {agent_name: telemetry}
+                else:
+                    result = agent_executor.invoke(inputs)
+            
+            update["messages"] = [
+                HumanMessage(content=request, name=agent_name),
+                AIMessage(content=(result or {}).get("output", f"{agent_name.capitalize()} analysis complete"), name=agent_name),
+            ]
+            print("✨ LLM reasoning applied")
+            
+        except Exception as e:
+            print(f"⚠️  Agent execution error: {e}")
+    
+    return update
+
 def productivity_node(state: AgentState) -> Dict:
     """
     Productivity Analysis Agent Node
     Uses LangChain agent with productivity tools to analyze task completion metrics
     """
-    global metrics_df
-    
     print("\n🚀 Productivity Agent Starting...")
     
-    messages = []
-    
-    # Create LangChain agent if LLM is available
-    if llm:
-        agent_executor = create_langchain_agent(llm, PRODUCTIVITY_TOOLS, PRODUCTIVITY_AGENT_PROMPT)
-        
-        if agent_executor:
-            try:
-                # Run agent with LLM reasoning
-                result = agent_executor.invoke({
-                    "input": "Analyze the productivity metrics and compute Task Completion Ratio (TCR) for all projects. Provide insights.",
-                    "chat_history": state.get("messages", [])
-                })
-                
-                messages.append(HumanMessage(content="Analyze productivity metrics"))
-                messages.append(AIMessage(content=result.get("output", "Productivity analysis complete")))
-                print("✨ LLM reasoning applied")
-                
-            except Exception as e:
-                print(f"⚠️  Agent execution error: {e}")
+    data_path = get_data_path(state, "productivity")
+    # Run LangChain agent reasoning if LLM is available
+    reasoning = run_agent_reasoning("productivity", state, data_path)
     
     # Get actual data (always runs, with or without LLM)
-    df = get_productivity_data.invoke({})
-    metrics_df = safe_merge(metrics_df, df)
+    df = load_agent_data(get_productivity_data, data_path, state)
     
     # Compute TCR
-    tcr = df["TCR"].mean() if not df.empty else None
+    tcr = float(df["TCR"].mean()) if not df.empty else None
     
     print(f"✅ Productivity Agent Complete - Average TCR: {tcr:.2f}%")
     
     # Return only updates
     return {
         "TCR": tcr,
-        "messages": messages,
+        **reasoning,
+        "entity_metrics": {"productivity": df[["EntityID", "TCR"]].to_dict("records")},
         "completed_agents": ["productivity"]
     }
 
@@ -103,43 +273,25 @@ def sentiment_node(state: AgentState) -> Dict:
     Sentiment Analysis Agent Node
     Uses LangChain agent with sentiment tools to analyze emotional data
     """
-    global metrics_df
-    
     print("\n😊 Sentiment Agent Starting...")
     
-    messages = []
-    
-    # Create LangChain agent if LLM is available
-    if llm:
-        agent_executor = create_langchain_agent(llm, SENTIMENT_TOOLS, SENTIMENT_AGENT_PROMPT)
-        
-        if agent_executor:
-            try:
-                result = agent_executor.invoke({
-                    "input": "Analyze worker sentiment using NLP and compute Sentiment Polarity Index (SPI). Provide emotional insights.",
-                    "chat_history": state.get("messages", [])
-                })
-                
-                messages.append(HumanMessage(content="Analyze sentiment metrics"))
-                messages.append(AIMessage(content=result.get("output", "Sentiment analysis complete")))
-                print("✨ LLM reasoning applied")
-                
-            except Exception as e:
-                print(f"⚠️  Agent execution error: {e}")
+    data_path = get_data_path(state, "sentiment")
+    # Run LangChain agent reasoning if LLM is available
+    reasoning = run_agent_reasoning("sentiment", state, data_path)
     
     # Get actual data (always runs)
-    df = get_sentiment_data.invoke({})
+    df = load_agent_data(get_sentiment_data, data_path, state)
     df = df.rename(columns={"Name": "EntityID"})
-    metrics_df = safe_merge(metrics_df, df)
     
     # Compute SPI
-    spi = df["SPI"].mean() if not df.empty else None
+    spi = float(df["SPI"].mean()) if not df.empty else None
     
     print(f"✅ Sentiment Agent Complete - Average SPI: {spi:.3f}")
     
     return {
         "SPI": spi,
-        "messages": messages,
+        **reasoning,
+        "entity_metrics": {"sentiment": df[["EntityID", "SPI"]].to_dict("records")},
         "completed_agents": ["sentiment"]
     }
 
@@ -148,43 +300,25 @@ def compliance_node(state: AgentState) -> Dict:
     Compliance Monitoring Agent Node
     Uses LangChain agent with compliance tools to track regulatory adherence
     """
-    global metrics_df
-    
     print("\n✅ Compliance Agent Starting...")
     
-    messages = []
-    
-    # Create LangChain agent if LLM is available
-    if llm:
-        agent_executor = create_langchain_agent(llm, COMPLIANCE_TOOLS, COMPLIANCE_AGENT_PROMPT)
-        
-        if agent_executor:
-            try:
-                result = agent_executor.invoke({
-                    "input": "Analyze compliance metrics and compute Disclosure Compliance Rate (DCR). Identify compliance risks.",
-                    "chat_history": state.get("messages", [])
-                })
-                
-                messages.append(HumanMessage(content="Analyze compliance metrics"))
-                messages.append(AIMessage(content=result.get("output", "Compliance analysis complete")))
-                print("✨ LLM reasoning applied")
-                
-            except Exception as e:
-                print(f"⚠️  Agent execution error: {e}")
+    data_path = get_data_path(state, "compliance")
+    # Run LangChain agent reasoning if LLM is available
+    reasoning = run_agent_reasoning("compliance", state, data_path)
     
     # Get actual data (always runs)
-    df = get_compliance_data.invoke({})
+    df = load_agent_data(get_compliance_data, data_path, state)
     df = df.rename(columns={"Company Name": "EntityID"})
-    metrics_df = safe_merge(metrics_df, df)
     
     # Compute DCR
-    dcr = df["DCR"].mean() if not df.empty else None
+    dcr = float(df["DCR"].mean()) if not df.empty else None
     
     print(f"✅ Compliance Agent Complete - Average DCR: {dcr:.2f}%")
     
     return {
         "DCR": dcr,
-        "messages": messages,
+        **reasoning,
+        "entity_metrics": {"compliance": df[["EntityID", "DCR"]].to_dict("records")},
         "completed_agents": ["compliance"]
     }
 
@@ -193,58 +327,102 @@ def interaction_node(state: AgentState) -> Dict:
     Social Interaction Analysis Agent Node
     Uses LangChain agent with interaction tools to analyze collaboration patterns
     """
-    global metrics_df
-    
     print("\n👥 Interaction Agent Starting...")
     
-    messages = []
-    
-    # Create LangChain agent if LLM is available
-    if llm:
-        agent_executor = create_langchain_agent(llm, INTERACTION_TOOLS, INTERACTION_AGENT_PROMPT)
-        
-        if agent_executor:
-            try:
-                result = agent_executor.invoke({
-                    "input": "Analyze social interactions and compute Collaboration Index (CI). Identify collaboration patterns.",
-                    "chat_history": state.get("messages", [])
-                })
-                
-                messages.append(HumanMessage(content="Analyze interaction metrics"))
-                messages.append(AIMessage(content=result.get("output", "Interaction analysis complete")))
-                print("✨ LLM reasoning applied")
-                
-            except Exception as e:
-                print(f"⚠️  Agent execution error: {e}")
+    data_path = get_data_path(state, "interaction")
+    # Run LangChain agent reasoning if LLM is available
+    reasoning = run_agent_reasoning("interaction", state, data_path)
     
     # Get actual data (always runs)
-    df = get_interaction_data.invoke({})
+    df = load_agent_data(get_interaction_data, data_path, state)
     df = df.rename(columns={"worker_id": "EntityID"})
-    metrics_df = safe_merge(metrics_df, df)
     
     # Compute CI
-    ci = df["CI"].mean() if not df.empty else None
+    ci = float(df["CI"].mean()) if not df.empty else None
     
     print(f"✅ Interaction Agent Complete - Average CI: {ci:.3f}")
     
     return {
         "CI": ci,
-        "messages": messages,
+        **reasoning,
+        "entity_metrics": {"interaction": df[["EntityID", "CI"]].to_dict("records")},
         "completed_agents": ["interaction"]
     }
 
+def org_unit_ids(n_units: int) -> pd.Series:
+    """Org_Unit_1..Org_Unit_n, built in Arrow when pyarrow is installed (string formatting dominates at scale)"""
+    numbers = np.arange(1, n_units + 1)
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return pd.Series(np.char.add("Org_Unit_", numbers.astype(str)))
+    ids = pc.binary_join_element_wise("Org_Unit_", pc.cast(pa.array(numbers), pa.string()), "")
+    return pd.Series(ids, dtype="string[pyarrow]")
+
+def synthesize_org_units(dcr_values: np.ndarray, n_units: int = DEFAULT_ORG_UNITS,
+                         seed: int = DEFAULT_ORG_UNIT_SEED) -> pd.DataFrame:
+    """
+    Simulate organizational units with realistic variance around the observed metrics.
+    All units are drawn at once from a seeded numpy Generator (reproducible per seed).
+    Returns DataFrame: EntityID, TCR, SPI, DCR, CI.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Sample with variation around the mean
+    tcr = rng.normal(71.6, 15, n_units)  # Mean 71.6, std 15
+    spi = rng.normal(0.494, 0.25, n_units)  # Mean 0.494, std 0.25
+    # Use actual DCR values (they have good variance)
+    if len(dcr_values) > 0:
+        dcr = rng.choice(np.asarray(dcr_values, dtype=float), n_units)
+    else:
+        dcr = np.full(n_units, 19.07)
+    ci = rng.normal(0.667, 0.15, n_units)  # Mean 0.667, std 0.15
+
+    # Clip to valid ranges
+    spi = np.clip(spi, -1, 1)
+    dcr = np.clip(dcr, 0, 100)
+
+    # Add some correlation patterns
+    # Higher training (DCR) -> slightly better productivity (TCR)
+    tcr = np.clip(np.clip(tcr, 40, 100) + dcr * 0.1, 40, 100)
+    # Better sentiment (SPI) -> slightly better collaboration (CI)
+    ci = np.clip(np.clip(ci, 0, 1) + spi * 0.2, 0, 1)
+
+    return pd.DataFrame({
+        "EntityID": org_unit_ids(n_units),
+        "TCR": tcr.round(2),
+        "SPI": spi.round(3),
+        "DCR": dcr.round(2),
+        "CI": ci.round(3),
+    })
+
 def correlation_node(state: AgentState) -> Dict:
     """
     Correlation Analysis Agent Node
     Uses LangChain agent with correlation tools to perform multivariate analysis
     """
-    global metrics_df
-    
     print("\n🔗 Correlation Agent Starting...")
     
+    # Join per-entity metrics reported by the analysis agents (through the crosswalk when given)
+    entity_metrics = state.get("entity_metrics") or {}
+    crosswalk_path = get_data_path(state, "crosswalk")
+    crosswalk = None
+    if crosswalk_path:
+        try:
+            crosswalk = EntityCrosswalk.from_file(crosswalk_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load entity crosswalk {crosswalk_path}: {e}")
+    matrix = build_metric_matrix(entity_metrics, AGENT_METRICS, crosswalk)
+    metrics_df = matrix.to_frame()
+    print(f"🔗 Joined {matrix.observations} metric values across {len(matrix.units)} "
+          f"{'crosswalk units' if crosswalk else 'entities'}")
+    
     # Save merged metrics
-    os.makedirs("results", exist_ok=True)
-    merged_path = "results/merged_metrics.csv"
+    results_dir = get_results_dir(state)
+    os.makedirs(results_dir, exist_ok=True)
+    merged_path = os.path.join(results_dir, "merged_metrics.csv")
+    raw_path = os.path.join(results_dir, "merged_metrics_raw.csv")
     
     # PROBLEM: Different datasets have different entity types (projects, users, companies, workers)
     # SOLUTION: Create aggregated metrics at organizational level with synthetic matching
@@ -255,58 +433,48 @@ def correlation_node(state: AgentState) -> Dict:
     # Simulate organizational units by grouping every N entities together
     required_cols = ["TCR", "SPI", "DCR", "CI"]
     
-    # Ensure all columns exist
-    for col in required_cols:
-        if col not in metrics_df.columns:
-            metrics_df[col] = None
-    
-    # Create meaningful aggregated dataset
-    # Group into 100 organizational units for analysis
-    n_groups = 100
-    
-    aggregated_data = []
-    for i in range(n_groups):
-        # Get random samples from each metric to simulate organizational variance
-        import numpy as np
-        np.random.seed(42 + i)  # Reproducible randomness
-        
-        # Sample with variation around the mean
-        tcr_sample = np.random.normal(71.6, 15, 1)[0]  # Mean 71.6, std 15
-        spi_sample = np.random.normal(0.494, 0.25, 1)[0]  # Mean 0.494, std 0.25
-        
-        # Use actual DCR values (they have good variance)
-        dcr_values = metrics_df['DCR'].dropna()
-        if len(dcr_values) > 0:
-            dcr_sample = np.random.choice(dcr_values)
-        else:
-            dcr_sample = 19.07
-        
-        ci_sample = np.random.normal(0.667, 0.15, 1)[0]  # Mean 0.667, std 0.15
-        
-        # Clip to valid ranges
-        tcr_sample = np.clip(tcr_sample, 40, 100)
-        spi_sample = np.clip(spi_sample, -1, 1)
-        dcr_sample = np.clip(dcr_sample, 0, 100)
-        ci_sample = np.clip(ci_sample, 0, 1)
-        
-        # Add some correlation patterns
-        # Higher training (DCR) -> slightly better productivity (TCR)
-        tcr_sample += dcr_sample * 0.1
-        tcr_sample = np.clip(tcr_sample, 40, 100)
-        
-        # Better sentiment (SPI) -> slightly better collaboration (CI)
-        ci_sample += spi_sample * 0.2
-        ci_sample = np.clip(ci_sample, 0, 1)
-        
-        aggregated_data.append({
-            'EntityID': f'Org_Unit_{i+1}',
-            'TCR': round(tcr_sample, 2),
-            'SPI': round(spi_sample, 3),
-            'DCR': round(dcr_sample, 2),
-            'CI': round(ci_sample, 3)
-        })
-    
-    df = pd.DataFrame(aggregated_data)
+    # Roll the joined observations up the organizational hierarchy (e.g. organization -> team)
+    rollup_levels = list(state.get("rollup_levels") or [])
+    cube = None
+    if rollup_levels and crosswalk is None:
+        print("⚠️  Rollup levels need an entity crosswalk - skipping the rollup")
+    elif rollup_levels:
+        try:
+            cube = RollupCube(observation_frame(entity_metrics, AGENT_METRICS, crosswalk),
+                              rollup_levels, required_cols)
+            cube_path = os.path.join(results_dir, "rollup_cube.csv")
+            cube.to_frame().to_csv(cube_path, index=False)
+            nodes = ", ".join(f"{count} {level}" for level, count in cube.node_counts().items())
+            print(f"📂 Rollup cube ({nodes}) saved: {cube_path}")
+        except ValueError as e:
+            print(f"⚠️  Could not build the rollup cube: {e}")
+    
+    # Correlate real joined units (or the finest rollup level) when the crosswalk covers enough of
+    # them with all four metrics, otherwise create a meaningful aggregated dataset of synthetic units
+    # joined_units: the crosswalk unit behind each joined row (for segment labels), when there is one
+    if cube is not None:
+        joined = cube.level_frame(rollup_levels[-1], complete_only=True)
+        paths = joined[rollup_levels].astype(str).itertuples(index=False)
+        joined.insert(0, "EntityID", ["/".join(path) for path in paths])
+        joined_units = joined["unit_id"] if "unit_id" in rollup_levels else None
+        joined = joined[["EntityID"] + required_cols]
+    else:
+        joined = matrix.to_frame(complete_only=True) if crosswalk else None
+        joined_units = joined["EntityID"] if joined is not None else None
+    if joined is not None and len(joined) >= MIN_JOINED_UNITS:
+        df = joined.round({"TCR": 2, "SPI": 3, "DCR": 2, "CI": 3})
+        unit_source = f"{rollup_levels[-1]}-level rollup" if cube is not None else "crosswalk-joined"
+    else:
+        if joined is not None:
+            print(f"⚠️  Only {len(joined)} crosswalk {'rollup nodes' if cube is not None else 'units'} "
+                  f"have all four metrics - using synthetic units")
+        seed = state.get("org_unit_seed")
+        df = synthesize_org_units(
+            matrix.column_values("DCR"),
+            n_units=int(state.get("org_units") or DEFAULT_ORG_UNITS),
+            seed=DEFAULT_ORG_UNIT_SEED if seed is None else int(seed),
+        )
+        unit_source = "synthetic"
     
     # Also save the original merged data for reference
     metrics_df_copy = metrics_df[["EntityID"] + required_cols].copy()
@@ -316,37 +484,20 @@ def correlation_node(state: AgentState) -> Dict:
         else:
             metrics_df_copy[col] = 0
     
-    metrics_df_copy.to_csv("results/merged_metrics_raw.csv", index=False)
-    print(f"📂 Raw merged metrics saved: results/merged_metrics_raw.csv")
+    metrics_df_copy.to_csv(raw_path, index=False)
+    print(f"📂 Raw merged metrics saved: {raw_path}")
     
     # Save aggregated data for correlation
     df.to_csv(merged_path, index=False)
     print(f"📂 Aggregated metrics for correlation saved: {merged_path}")
-    print(f"   - Created {n_groups} organizational units with meaningful variance")
+    print(f"   - Using {len(df)} {unit_source} organizational units")
     print(f"   - TCR variance: {df['TCR'].var():.2f}")
     print(f"   - SPI variance: {df['SPI'].var():.4f}")
     print(f"   - DCR variance: {df['DCR'].var():.2f}")
     print(f"   - CI variance: {df['CI'].var():.4f}")
     
-    messages = []
-    
-    # Create LangChain agent if LLM is available
-    if llm:
-        agent_executor = create_langchain_agent(llm, CORRELATION_TOOLS, CORRELATION_AGENT_PROMPT)
-        
-        if agent_executor:
-            try:
-                result = agent_executor.invoke({
-                    "input": f"Perform correlation analysis on the aggregated metrics at {merged_path}. Compute Outcome Correlation Score with statistical significance.",
-                    "chat_history": state.get("messages", [])
-                })
-                
-                messages.append(HumanMessage(content="Perform correlation analysis"))
-                messages.append(AIMessage(content=result.get("output", "Correlation analysis complete")))
-                print("✨ LLM reasoning applied")
-                
-            except Exception as e:
-                print(f"⚠️  Agent execution error: {e}")
+    # Run LangChain agent reasoning if LLM is available
+    reasoning = run_agent_reasoning("correlation", state, merged_path)
     
     # Perform actual correlation analysis
     ocs = None
@@ -355,9 +506,39 @@ def correlation_node(state: AgentState) -> Dict:
             engine = CorrelationEngine()
             X = df[required_cols].values
             y = [1 if x > 70 else 0 for x in df["TCR"]]  # Binary outcome
-            ocs = engine.run_regression(X, y)
+            ocs = engine.run_regression(
+                X, y,
+                bootstrap_resamples=int(state.get("bootstrap_resamples") or 0),
+                execution_backend=get_execution_backend(state),
+                permutations=int(state.get("permutations") or 0),
+            )
         except Exception as e:
             print(f"⚠️  Correlation calculation error: {e}")
+        if ocs is not None:
+            # Synthetic units are seeded draws, not observations - consumers pooling OCS need to know
+            ocs["unit_source"] = unit_source
+        if ocs is not None and cube is not None:
+            ocs["rollup"] = {"levels": rollup_levels, "nodes": cube.node_counts(), "path": cube_path}
+            if unit_source == "synthetic":
+                # Too few complete nodes: the OCS above was fitted on synthetic units, not the rollup
+                ocs["rollup"].update({"correlated": False, "complete_nodes": len(joined), "fallback": "synthetic"})
+            else:
+                ocs["rollup"].update({"correlated": True, "level": rollup_levels[-1]})
+        # Per-segment OCS when the crosswalk labels the units behind the correlated rows
+        segmented = ocs is not None and unit_source != "synthetic" and not crosswalk.segments.empty
+        if segmented and joined_units is None:
+            print(f"⚠️  Segment OCS skipped: rollup level {rollup_levels[-1]} is above unit_id, "
+                  f"so its nodes have no single segment")
+        elif segmented:
+            try:
+                segment_report = engine.run_grouped_regression(X, y, crosswalk.segment_of(joined_units))
+                segment_path = os.path.join(results_dir, "segment_ocs.csv")
+                segment_report.to_csv(segment_path, index=False)
+                fitted = int(segment_report["r_squared"].notna().sum())
+                ocs["segments"] = {"count": len(segment_report), "fitted": fitted, "path": segment_path}
+                print(f"📂 Segment OCS for {fitted}/{len(segment_report)} segments saved: {segment_path}")
+            except Exception as e:
+                print(f"⚠️  Segment correlation error: {e}")
     else:
         print("⚠️ Not enough valid rows for correlation")
     
@@ -366,6 +547,39 @@ def correlation_node(state: AgentState) -> Dict:
     return {
         "OCS": ocs,
         "merged_data_path": merged_path,
-        "messages": messages,
+        **reasoning,
         "completed_agents": ["correlation"]
-    }
\ No newline at end of file
+    }
+
+def narrative_node(state: AgentState) -> Dict:
+    """
+    Consolidated Narrative Node
+    In consolidated mode the per-agent LLM loops are skipped; this node writes every
+    agent's insight section with a single structured LLM call after correlation.
+    """
+    if get_narrative_mode(state) != "consolidated":
+        return {}
+    llm = get_agent_llm()
+    if not llm:
+        return {}
+    
+    print("\n📝 Consolidated Narrative Starting...")
+    update = {}
+    try:
+        chain = NARRATIVE_PROMPT | llm.with_structured_output(NarrativeReport)
+        inputs = {"metrics": build_narrative_input(state)}
+        if state.get("streaming"):
+            report, telemetry = stream_with_telemetry(chain, inputs, "narrative")
+            update["agent_telemetry"] = {"narrative": telemetry}
+        else:
+            report = chain.invoke(inputs)
+    except Exception as e:
+        print(f"⚠️  Narrative generation error: {e}")
+        return {}
+    
+    print("✅ Consolidated Narrative Complete")
+    return {
+        "insights": report.model_dump(),
+        "completed_agents": ["narrative"],
+        **update
+    }
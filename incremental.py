@@ -0,0 +1,85 @@
+"""
+Dependency-Aware Incremental Re-Execution
+Uses each node's declared inputs (graph_nodes.NODE_INPUTS) to decide which nodes
+must rerun: a node is stale when its datasets, code or prompt changed, and every
+node downstream of a stale node is stale too. Fresh nodes' stored outputs are
+restored into the state instead of running them.
+"""
+from typing import Dict, List
+
+from langgraph.graph import END
+
+from graph_nodes import NODE_INPUTS, node_cache_spec
+from node_cache import NodeCache
+
+# Reducer behaviour of state keys when restoring stored outputs
+LIST_KEYS = ("messages", "completed_agents", "shard_results")
+DICT_KEYS = ("entity_metrics", "agent_telemetry")
+
+
+def _topological_order() -> List[str]:
+    """Nodes ordered so every node comes after its upstream nodes"""
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for upstream in NODE_INPUTS[name].get("upstream", []):
+            visit(upstream)
+        order.append(name)
+
+    for name in NODE_INPUTS:
+        visit(name)
+    return order
+
+
+def _apply_output(target: Dict, output: Dict):
+    """Fold a stored node output into an update dict the way the state reducers would"""
+    for key, value in output.items():
+        if key in LIST_KEYS:
+            target[key] = target.get(key, []) + list(value or [])
+        elif key in DICT_KEYS:
+            target[key] = {**target.get(key, {}), **(value or {})}
+        else:
+            target[key] = value
+
+
+def make_run_planner(cache: NodeCache):
+    """
+    Build the planning node that runs first in an incremental graph.
+    It restores outputs of unchanged nodes and records the stale nodes to run.
+    """
+    def plan_run(state) -> Dict:
+        updates, stale = {}, []
+        view = dict(state)
+
+        for name in _topological_order():
+            upstream_stale = any(up in stale for up in NODE_INPUTS[name].get("upstream", []))
+            cached = None
+            if not upstream_stale:
+                _, cached = cache.lookup(name, view, **node_cache_spec(name))
+
+            if cached is None:
+                stale.append(name)
+            else:
+                _apply_output(updates, cached)
+                _apply_output(view, cached)
+
+        reused = [name for name in NODE_INPUTS if name not in stale]
+        print(f"🔎 Incremental run - rerunning: {', '.join(stale) or 'nothing'}"
+              f"; reusing: {', '.join(reused) or 'nothing'}")
+        updates["stale_nodes"] = stale
+        return updates
+
+    return plan_run
+
+
+def route_stale_nodes(state) -> List[str]:
+    """Send the run to the stale nodes with no stale upstream (downstream ones follow via edges)"""
+    stale = state.get("stale_nodes") or []
+    entry = [
+        name for name in stale
+        if not any(up in stale for up in NODE_INPUTS[name].get("upstream", []))
+    ]
+    return entry or [END]
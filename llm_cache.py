@@ -0,0 +1,136 @@
+"""
+Persistent LLM Response Cache
+SQLite-backed LangChain cache for chat model responses. Entries are keyed by the
+rendered prompt, the model string (model, temperature and bound tool schemas) and a
+fingerprint of the data the calling agent is analyzing, and expire by TTL and LRU size.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import warnings
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+LLM_CACHE_PATH = os.path.join("results", ".cache", "llm_cache.sqlite")
+
+# Fingerprint of the data behind the current agent call (set by the graph nodes)
+_data_fingerprint: ContextVar[str] = ContextVar("llm_data_fingerprint", default="")
+
+
+@contextmanager
+def llm_data_scope(fingerprint: str):
+    """Tag LLM calls made inside the block with the fingerprint of the data they analyze"""
+    token = _data_fingerprint.set(fingerprint)
+    try:
+        yield
+    finally:
+        _data_fingerprint.reset(token)
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain BaseCache stored in SQLite.
+
+    Args:
+        path: SQLite database file
+        ttl_seconds: Entries older than this are treated as misses and purged
+        max_entries: Least recently used entries beyond this count are evicted
+    """
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 2000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, generations TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        payload = json.dumps([prompt, llm_string, _data_fingerprint.get()])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT generations, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            with warnings.catch_warnings():
+                # langchain_core.load is marked beta; entries are written by this cache only
+                warnings.simplefilter("ignore")
+                generations = [loads(item) for item in json.loads(row[0])]
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        generations = json.dumps([dumps(gen) for gen in return_val])
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, generations, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, generations, now, now)
+            )
+            conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM llm_responses WHERE key NOT IN "
+                "(SELECT key FROM llm_responses ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM llm_responses")
+
+
+_response_cache = None
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Shared response cache configured from the environment, or None when
+    LLM_CACHE=0. LLM_CACHE_TTL_SECONDS and LLM_CACHE_MAX_ENTRIES tune eviction.
+    """
+    global _response_cache
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    if _response_cache is None:
+        _response_cache = LLMResponseCache(
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")),
+        )
+    return _response_cache
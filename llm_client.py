@@ -0,0 +1,376 @@
+"""
+Shared Rate-Limited LLM Client
+All agents in a process share one limiter in front of the provider:
+  - token buckets for requests per minute and (estimated) tokens per minute
+  - a global cap on in-flight requests
+  - retries with jittered exponential backoff on 429, 5xx, timeouts and connection errors
+  - a circuit breaker that fails fast after repeated failures until a cool-down passes
+Counters are exposed through LLMClientLimiter.stats() for monitoring.
+
+Limits are configured from the environment (see get_llm_limiter). The OpenAI chat
+model that uses the limiter lives in llm_openai.py so this module stays light to import.
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from langchain_core.messages.utils import count_tokens_approximately
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` units per second"""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` units and return how long the caller must wait before using them.
+        Requests larger than the bucket are clamped to its capacity.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_seconds`; then lets one trial call through (half-open) to decide
+    whether to close again.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Admit a call or raise CircuitOpenError; True when the call is the half-open trial"""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    raise CircuitOpenError("LLM circuit breaker is open - provider calls are paused")
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    raise CircuitOpenError("LLM circuit breaker is half-open - waiting on trial call")
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self):
+        """End a trial call that neither closed nor reopened the breaker (e.g. a 400 or an interrupt)"""
+        with self._lock:
+            if self.state == "half_open":
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and connection failures are worth retrying"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in ("APITimeoutError", "APIConnectionError", "TimeoutError", "ConnectionError")
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-provided Retry-After delay, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMClientLimiter:
+    """
+    Process-wide admission control and retry policy for LLM requests.
+
+    Args:
+        requests_per_minute: Request token bucket rate (burst = one minute of requests)
+        tokens_per_minute: Estimated prompt+completion token bucket rate
+        max_in_flight: Concurrent requests allowed across all agents
+        max_retries: Retries per request after the first attempt
+        backoff_base / backoff_max: Exponential backoff bounds in seconds (full jitter)
+        breaker: Circuit breaker shared by all requests
+    """
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200_000,
+                 max_in_flight: int = 8, max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, breaker: CircuitBreaker = None):
+        self.requests = TokenBucket(requests_per_minute / 60.0, max(requests_per_minute, 1))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, max(tokens_per_minute, 1))
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        # Async callers wait for a slot on these threads (blocking, in arrival order) rather than polling
+        self._slot_waiters = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="llm-slot")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "rejected_by_breaker": 0,
+            "throttled_seconds": 0.0,
+            "backoff_seconds": 0.0,
+            "in_flight": 0,
+        }
+
+    def _count(self, key: str, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+        stats["throttled_seconds"] = round(stats["throttled_seconds"], 3)
+        stats["backoff_seconds"] = round(stats["backoff_seconds"], 3)
+        stats["max_in_flight"] = self.max_in_flight
+        stats["circuit_state"] = self.breaker.state
+        stats["circuit_opened"] = self.breaker.times_opened
+        return stats
+
+    @contextmanager
+    def _attempt(self, estimated_tokens: int):
+        """
+        Admit one attempt and yield its rate-limit delay. A half-open trial is released
+        on every way out (success, any error, cancellation or an abandoned stream), so a
+        trial that neither closes nor reopens the breaker cannot leave it stuck half-open.
+        """
+        try:
+            trial = self.breaker.allow()
+        except CircuitOpenError:
+            self._count("rejected_by_breaker")
+            raise
+        try:
+            delay = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+            self._count("throttled_seconds", delay)
+            yield delay
+        finally:
+            if trial:
+                self.breaker.release_trial()
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        self._count("retries")
+        self._count("backoff_seconds", delay)
+        return delay
+
+    def _finish(self, error: Optional[Exception]) -> bool:
+        """Record the attempt outcome; True when the caller should retry"""
+        if error is None:
+            self.breaker.record_success()
+            self._count("succeeded")
+            return False
+        if not is_retryable(error):
+            self._count("failed")
+            return False
+        self.breaker.record_failure()
+        return True
+
+    def call(self, func: Callable[[], Any], estimated_tokens: int = 0):
+        """Run a provider call under rate limits, the in-flight cap and the retry policy"""
+        self._count("requests")
+        for attempt in range(self.max_retries + 1):
+            with self._attempt(estimated_tokens) as delay:
+                time.sleep(delay)
+                with self._slots:
+                    self._count("in_flight")
+                    try:
+                        result = func()
+                    except Exception as e:
+                        error = e
+                    else:
+                        error = None
+                    finally:
+                        self._count("in_flight", -1)
+                retry = self._finish(error)
+            if not retry:
+                if error is not None:
+                    raise error
+                return result
+            if attempt == self.max_retries:
+                self._count("failed")
+                raise error
+            time.sleep(self._backoff_delay(attempt, error))
+
+    def stream(self, func: Callable[[], Iterator], estimated_tokens: int = 0) -> Iterator:
+        """Streaming variant of call(); a request is only retried if it fails before its first chunk"""
+        self._count("requests")
+        for attempt in range(self.max_retries + 1):
+            with self._attempt(estimated_tokens) as delay:
+                time.sleep(delay)
+                started = False
+                with self._slots:
+                    self._count("in_flight")
+                    try:
+                        for chunk in func():
+                            started = True
+                            yield chunk
+                        error = None
+                    except Exception as e:
+                        error = e
+                    finally:
+                        self._count("in_flight", -1)
+                if started and error is not None:
+                    self.breaker.record_failure()
+                    self._count("failed")
+                    raise error
+                retry = self._finish(error)
+            if not retry:
+                if error is not None:
+                    raise error
+                return
+            if attempt == self.max_retries:
+                self._count("failed")
+                raise error
+            time.sleep(self._backoff_delay(attempt, error))
+
+    async def _acquire_slot(self):
+        """
+        Wait for an in-flight slot without blocking the event loop. The shared semaphore also
+        caps the sync paths; the waiter pool queues async callers FIFO and only wakes them once.
+        """
+        waiter = self._slot_waiters.submit(self._slots.acquire)
+        try:
+            await asyncio.shield(asyncio.wrap_future(waiter))
+        except asyncio.CancelledError:
+            # The helper thread still gets the slot - hand it straight back
+            waiter.add_done_callback(lambda _: self._slots.release())
+            raise
+
+    async def acall(self, func: Callable[[], Any], estimated_tokens: int = 0):
+        """Async variant of call() that waits without blocking the event loop"""
+        self._count("requests")
+        for attempt in range(self.max_retries + 1):
+            with self._attempt(estimated_tokens) as delay:
+                await asyncio.sleep(delay)
+                await self._acquire_slot()
+                self._count("in_flight")
+                try:
+                    result = await func()
+                except Exception as e:
+                    error = e
+                else:
+                    error = None
+                finally:
+                    self._count("in_flight", -1)
+                    self._slots.release()
+                retry = self._finish(error)
+            if not retry:
+                if error is not None:
+                    raise error
+                return result
+            if attempt == self.max_retries:
+                self._count("failed")
+                raise error
+            await asyncio.sleep(self._backoff_delay(attempt, error))
+
+    async def astream(self, func: Callable[[], Any], estimated_tokens: int = 0):
+        """Async streaming variant of stream()"""
+        self._count("requests")
+        for attempt in range(self.max_retries + 1):
+            with self._attempt(estimated_tokens) as delay:
+                await asyncio.sleep(delay)
+                await self._acquire_slot()
+                self._count("in_flight")
+                started = False
+                try:
+                    async for chunk in func():
+                        started = True
+                        yield chunk
+                    error = None
+                except Exception as e:
+                    error = e
+                finally:
+                    self._count("in_flight", -1)
+                    self._slots.release()
+                if started and error is not None:
+                    self.breaker.record_failure()
+                    self._count("failed")
+                    raise error
+                retry = self._finish(error)
+            if not retry:
+                if error is not None:
+                    raise error
+                return
+            if attempt == self.max_retries:
+                self._count("failed")
+                raise error
+            await asyncio.sleep(self._backoff_delay(attempt, error))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> LLMClientLimiter:
+    """
+    Process-wide limiter configured from LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_IN_FLIGHT, LLM_MAX_RETRIES, LLM_CIRCUIT_FAILURES and LLM_CIRCUIT_RESET_SECONDS
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = LLMClientLimiter(
+                requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500")),
+                tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000")),
+                max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURES", "5")),
+                    reset_seconds=float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30")),
+                ),
+            )
+        return _limiter
+
+
+def estimate_request_tokens(messages, max_output_tokens: Optional[int] = None) -> int:
+    """Approximate prompt tokens plus the completion allowance charged to the token bucket"""
+    return count_tokens_approximately(messages) + (max_output_tokens or 512)
@@ -0,0 +1,46 @@
+"""
+Rate-Limited OpenAI Chat Model
+ChatOpenAI routed through the shared LLMClientLimiter (llm_client.py). Kept in its
+own module so langchain_openai is only imported when an OpenAI model is created.
+"""
+from typing import Optional
+
+from langchain_openai import ChatOpenAI
+
+from llm_client import estimate_request_tokens, get_llm_limiter
+
+
+class RateLimitedChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI whose requests all go through the shared LLMClientLimiter.
+    The SDK's own retries are disabled (max_retries=0) so the limiter owns the retry policy.
+    """
+    max_retries: Optional[int] = 0
+
+    def _estimate(self, messages) -> int:
+        return estimate_request_tokens(messages, self.max_tokens)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return get_llm_limiter().call(
+            lambda: super(RateLimitedChatOpenAI, self)._generate(messages, stop, run_manager, **kwargs),
+            self._estimate(messages),
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await get_llm_limiter().acall(
+            lambda: super(RateLimitedChatOpenAI, self)._agenerate(messages, stop, run_manager, **kwargs),
+            self._estimate(messages),
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from get_llm_limiter().stream(
+            lambda: super(RateLimitedChatOpenAI, self)._stream(messages, stop, run_manager, **kwargs),
+            self._estimate(messages),
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in get_llm_limiter().astream(
+            lambda: super(RateLimitedChatOpenAI, self)._astream(messages, stop, run_manager, **kwargs),
+            self._estimate(messages),
+        ):
+            yield chunk
@@ -3,52 +3,124 @@ Multi-AI Agent Monitoring System
 Powered by LangChain Agent Framework with LangGraph
 """
 from langgraph.graph import StateGraph, START, END
-from graph_nodes import productivity_node, sentiment_node, compliance_node, interaction_node, correlation_node
+from graph_nodes import (
+    productivity_node, sentiment_node, compliance_node, interaction_node, correlation_node,
+    narrative_node, NODE_INPUTS, node_cache_spec
+)
 from state_schema import AgentState
+from node_cache import NodeCache, memoize_node, open_checkpointer
+from process_backend import EXECUTION_BACKENDS
+from sharding import make_shard_dispatcher, shard_node, agent_reasoning_node, merge_shards_node
+from incremental import make_run_planner, route_stale_nodes
+from narrative import NARRATIVE_MODES
+from tool_cache import release_run
+from agents.CorrelationMatrix import correlation_matrix
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import uuid
 import os
 
-def initialize_state() -> AgentState:
+# Memoization inputs of the shard map task (the analysis nodes declare theirs in graph_nodes.NODE_INPUTS)
+SHARD_TASK_INPUTS = {
+    "files": lambda task: [task["data_path"]],
+    "modules": ["sharding", "agents.ProductivityAgent", "agents.SentimentAgent",
+                "agents.ComplianceAgent", "agents.InteractionAgent"],
+    "state_keys": ["agent", "shard", "n_shards"],
+}
+
+def initialize_state(data_paths: dict = None, results_dir: str = "results",
+                     execution_backend: str = "thread", narrative_mode: str = "agents",
+                     streaming: bool = False, run_id: str = None, org_units: int = 100,
+                     org_unit_seed: int = 42, bootstrap_resamples: int = 0,
+                     rollup_levels: list = None, permutations: int = 0) -> AgentState:
     """Initialize the agent state with default values"""
     return {
+        "run_id": run_id or f"run-{uuid.uuid4().hex[:8]}",
+        "data_paths": data_paths or {},
+        "results_dir": results_dir,
+        "execution_backend": execution_backend,
+        "narrative_mode": narrative_mode,
+        "streaming": streaming,
+        "org_units": org_units,
+        "org_unit_seed": org_unit_seed,
+        "bootstrap_resamples": bootstrap_resamples,
+        "rollup_levels": rollup_levels or [],
+        "permutations": permutations,
         "TCR": None,
         "SPI": None,
         "DCR": None,
         "CI": None,
         "OCS": None,
+        "insights": None,
         "messages": [],
         "merged_data_path": None,
-        "completed_agents": []
+        "entity_metrics": {},
+        "shard_results": [],
+        "completed_agents": [],
+        "agent_telemetry": {}
     }
 
-if __name__ == "__main__":
-    print("\n" + "="*60)
-    print("🤖 Multi-AI Agent Monitoring System")
-    print("   Powered by LangChain + LangGraph")
-    print("="*60)
+def build_graph(cache: NodeCache = None, checkpointer=None, shards: int = 1, incremental: bool = False):
+    """
+    Build and compile the agent graph.
+    
+    Args:
+        cache: Optional NodeCache - nodes with unchanged inputs return cached outputs
+        checkpointer: Optional LangGraph checkpointer used to resume interrupted runs
+        shards: Split each analysis agent into this many entity hash-range shards (1 = no sharding)
+        incremental: Plan the run first and execute only nodes whose inputs changed
+            (plus their downstream nodes); requires a cache and shards == 1
+    """
+    if shards > 1:
+        nodes = {
+            "shard_task": shard_node,
+            "agent_reasoning": agent_reasoning_node,
+            "merge_shards": merge_shards_node,
+            "correlation": correlation_node,
+            "narrative": narrative_node,
+        }
+    else:
+        nodes = {
+            "productivity": productivity_node,
+            "sentiment": sentiment_node,
+            "compliance": compliance_node,
+            "interaction": interaction_node,
+            "correlation": correlation_node,
+            "narrative": narrative_node,
+        }
     
-    # Build the agent graph
-    graph = StateGraph(AgentState)
-
-    # Build the agent graph
     graph = StateGraph(AgentState)
 
     # Add agent nodes
-    print("\n📋 Building Agent Graph...")
-    graph.add_node("productivity", productivity_node)
-    graph.add_node("sentiment", sentiment_node)
-    graph.add_node("compliance", compliance_node)
-    graph.add_node("interaction", interaction_node)
-    graph.add_node("correlation", correlation_node)
+    for name, node in nodes.items():
+        if cache is not None and name in NODE_INPUTS:
+            node = memoize_node(node, name, cache, **node_cache_spec(name))
+        elif cache is not None and name == "shard_task":
+            node = memoize_node(node, name, cache, **SHARD_TASK_INPUTS)
+        graph.add_node(name, node)
+
+    if shards > 1:
+        # Fan out each analysis agent into shard tasks, then reduce before correlation
+        graph.add_conditional_edges(START, make_shard_dispatcher(shards), ["shard_task", "agent_reasoning"])
+        graph.add_edge("shard_task", "merge_shards")
+        graph.add_edge("agent_reasoning", "merge_shards")
+        graph.add_edge("merge_shards", "correlation")
+        graph.add_edge("correlation", "narrative")
+        graph.add_edge("narrative", END)
+        return graph.compile(checkpointer=checkpointer)
 
     # Define workflow edges
-    # All analysis agents run in parallel from START
-    graph.add_edge(START, "productivity")
-    graph.add_edge(START, "sentiment")
-    graph.add_edge(START, "compliance")
-    graph.add_edge(START, "interaction")
+    if incremental and cache is not None:
+        # Restore unchanged nodes' outputs, then start only the stale nodes
+        graph.add_node("plan_run", make_run_planner(cache))
+        graph.add_edge(START, "plan_run")
+        graph.add_conditional_edges("plan_run", route_stale_nodes, list(NODE_INPUTS) + [END])
+    else:
+        # All analysis agents run in parallel from START
+        graph.add_edge(START, "productivity")
+        graph.add_edge(START, "sentiment")
+        graph.add_edge(START, "compliance")
+        graph.add_edge(START, "interaction")
 
     # Correlation agent waits for all analysis agents
     graph.add_edge("productivity", "correlation")
@@ -56,67 +128,23 @@ if __name__ == "__main__":
     graph.add_edge("compliance", "correlation")
     graph.add_edge("interaction", "correlation")
     
-    # Correlation is the final node
-    graph.add_edge("correlation", END)
+    # Consolidated narrative (a no-op in per-agent narrative mode) is the final node
+    graph.add_edge("correlation", "narrative")
+    graph.add_edge("narrative", END)
 
-    # Compile and execute the graph
-    print("✅ Graph compiled successfully")
-    app = graph.compile()
-    
-    print("\n🚀 Starting Multi-Agent Analysis Pipeline...")
-    print("-" * 60)
-    
-    # Run the workflow
-    final_state = app.invoke(initialize_state())
-    
-    print("\n" + "="*60)
-    print("📊 Multi-AI Agent Analysis Complete!")
-    print("="*60)
-
-    # Load merged dataset
-    df = pd.read_csv("results/merged_metrics.csv")
+    return graph.compile(checkpointer=checkpointer)
 
-    # Show first few rows of per-agent data
-    print("\n📊 Sample of merged per-entity metrics:")
-    print(df.head())
+def plot_results(df: pd.DataFrame, ocs: dict):
+    """Save the analysis dashboard and radar chart (plotting libraries are imported here, on demand)"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    # Compute and display averages
+    ocs = ocs if isinstance(ocs, dict) else {}
     avg_TCR = df["TCR"].mean()
     avg_SPI = df["SPI"].mean()
     avg_DCR = df["DCR"].mean()
     avg_CI = df["CI"].mean()
 
-    print("\n📈 Aggregated Metrics:")
-    print(f"Average Task Completion Ratio (TCR): {avg_TCR:.2f}%")
-    print(f"Average Sentiment Polarity Index (SPI): {avg_SPI:.2f}")
-    print(f"Average Disclosure Compliance Rate (DCR): {avg_DCR:.2f}%")
-    print(f"Average Collaboration Index (CI): {avg_CI:.2f}")
-
-    # Display Outcome Correlation Index with statistical significance
-    print("\n🔗 Outcome Correlation Index (OCI):")
-    ocs = final_state.get("OCS", None)
-    if ocs:
-        if isinstance(ocs, dict):
-            print(f"  R² Score: {ocs.get('r_squared', 'N/A')}")
-            print(f"  Statistical Significance: {ocs.get('significance', 'N/A')}")
-            if ocs.get('p_values'):
-                print(f"  P-values by Feature:")
-                for feature, p_val in zip(ocs.get('feature_names', []), ocs.get('p_values', [])):
-                    print(f"    - {feature}: {p_val}")
-            if ocs.get('coefficients'):
-                print(f"  Regression Coefficients:")
-                for feature, coef in zip(ocs.get('feature_names', []), ocs.get('coefficients', [])):
-                    print(f"    - {feature}: {coef}")
-            if ocs.get('pca_variance'):
-                print(f"  PCA Explained Variance Ratio:")
-                for i, var in enumerate(ocs.get('pca_variance', []), 1):
-                    print(f"    - Component {i}: {var}")
-        else:
-            print(f"  {ocs}")
-    else:
-        print("  Unable to calculate OCI")
-
-    # ===== VISUALIZATIONS =====
     print("\n📊 Generating visualizations...")
     
     # Set style
@@ -161,10 +189,12 @@ if __name__ == "__main__":
     
     # 4. Correlation Heatmap
     ax4 = plt.subplot(2, 3, 4)
-    corr_matrix = df[['TCR', 'SPI', 'DCR', 'CI']].corr()
-    sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm', center=0, 
+    correlations = correlation_matrix(df[['TCR', 'SPI', 'DCR', 'CI']])
+    # Pairs still significant after FDR control are starred
+    labels = correlations['r'].map(lambda r: f"{r:.2f}") + correlations['significant'].map(lambda s: "*" if s else "")
+    sns.heatmap(correlations['r'], annot=labels, fmt='', cmap='coolwarm', center=0,
                 ax=ax4, cbar_kws={'label': 'Correlation'}, square=True)
-    ax4.set_title('Metric Correlation Matrix', fontsize=12, fontweight='bold')
+    ax4.set_title('Metric Correlation Matrix (* q < 0.05)', fontsize=12, fontweight='bold')
     
     # 5. Box Plot of Metrics (normalized)
     ax5 = plt.subplot(2, 3, 5)
@@ -240,3 +270,155 @@ if __name__ == "__main__":
     plt.close()
     
     print("\n✨ Visualization complete!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-AI Agent Monitoring System")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every node instead of reusing cached outputs")
+    parser.add_argument("--resume", metavar="THREAD_ID", help="Resume an interrupted run from its last completed node")
+    parser.add_argument("--shards", type=int, default=1, help="Split each analysis agent into N entity shards")
+    parser.add_argument("--backend", choices=EXECUTION_BACKENDS, default="thread",
+                        help="Run CPU-bound node compute in threads or in a persistent process pool")
+    parser.add_argument("--narrative", choices=NARRATIVE_MODES, default="agents",
+                        help="One LLM agent loop per agent, or one consolidated LLM call after all metrics")
+    parser.add_argument("--no-plots", action="store_true",
+                        help="Skip the charts (and never import the plotting libraries)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream LLM tokens to the console and report per-agent latency telemetry")
+    parser.add_argument("--org-units", type=int, default=100,
+                        help="Number of synthetic organizational units built for correlation")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the organizational unit generator")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="N",
+                        help="Add bootstrap confidence intervals from N resamples to the OCS")
+    parser.add_argument("--permutations", type=int, default=0, metavar="N",
+                        help="Use empirical p-values from N permutations of the outcome instead of t-tests")
+    parser.add_argument("--crosswalk", metavar="PATH",
+                        help="Entity crosswalk (agent,entity_id,unit_id) used to join the sources for correlation")
+    parser.add_argument("--rollup", metavar="LEVELS",
+                        help="Comma-separated crosswalk hierarchy, coarsest first (e.g. organization,unit_id); "
+                             "correlation runs at the last level")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("🤖 Multi-AI Agent Monitoring System")
+    print("   Powered by LangChain + LangGraph")
+    print("="*60)
+    
+    # Build the agent graph
+    print("\n📋 Building Agent Graph...")
+    cache = None if args.no_cache else NodeCache()
+    checkpointer = open_checkpointer()
+    app = build_graph(cache=cache, checkpointer=checkpointer, shards=args.shards, incremental=cache is not None)
+    print("✅ Graph compiled successfully")
+    
+    thread_id = args.resume or f"run-{uuid.uuid4().hex[:8]}"
+    config = {"configurable": {"thread_id": thread_id}}
+    
+    print("\n🚀 Starting Multi-Agent Analysis Pipeline...")
+    print(f"   Run ID: {thread_id} (resume with --resume {thread_id})")
+    print("-" * 60)
+    
+    # Run the workflow (or continue an interrupted one)
+    initial_state = initialize_state(data_paths={"crosswalk": args.crosswalk} if args.crosswalk else None,
+                                     execution_backend=args.backend, narrative_mode=args.narrative,
+                                     streaming=args.stream, run_id=thread_id,
+                                     org_units=args.org_units, org_unit_seed=args.seed,
+                                     bootstrap_resamples=args.bootstrap,
+                                     rollup_levels=[level.strip() for level in args.rollup.split(",")] if args.rollup else None,
+                                     permutations=args.permutations)
+    if args.resume and checkpointer is not None:
+        snapshot = app.get_state(config)
+        if snapshot.next:
+            print(f"⏯️  Resuming at: {', '.join(snapshot.next)}")
+            final_state = app.invoke(None, config)
+        elif snapshot.values:
+            print("✅ Run already complete - using saved state")
+            final_state = snapshot.values
+        else:
+            print("⚠️  No saved run found - starting a new run")
+            final_state = app.invoke(initial_state, config)
+    else:
+        final_state = app.invoke(initial_state, config)
+    release_run(thread_id)
+    
+    print("\n" + "="*60)
+    print("📊 Multi-AI Agent Analysis Complete!")
+    print("="*60)
+
+    # Load merged dataset
+    df = pd.read_csv(final_state.get("merged_data_path") or "results/merged_metrics.csv")
+
+    # Show first few rows of per-agent data
+    print("\n📊 Sample of merged per-entity metrics:")
+    print(df.head())
+
+    # Compute and display averages
+    avg_TCR = df["TCR"].mean()
+    avg_SPI = df["SPI"].mean()
+    avg_DCR = df["DCR"].mean()
+    avg_CI = df["CI"].mean()
+
+    print("\n📈 Aggregated Metrics:")
+    print(f"Average Task Completion Ratio (TCR): {avg_TCR:.2f}%")
+    print(f"Average Sentiment Polarity Index (SPI): {avg_SPI:.2f}")
+    print(f"Average Disclosure Compliance Rate (DCR): {avg_DCR:.2f}%")
+    print(f"Average Collaboration Index (CI): {avg_CI:.2f}")
+
+    # Display Outcome Correlation Index with statistical significance
+    print("\n🔗 Outcome Correlation Index (OCI):")
+    ocs = final_state.get("OCS", None)
+    if ocs:
+        if isinstance(ocs, dict):
+            print(f"  R² Score: {ocs.get('r_squared', 'N/A')}")
+            print(f"  Statistical Significance: {ocs.get('significance', 'N/A')}")
+            if ocs.get('p_values'):
+                method = "permutation test" if ocs.get('p_value_method') == "permutation" else "t-test"
+                print(f"  P-values by Feature ({method}):")
+                for feature, p_val in zip(ocs.get('feature_names', []), ocs.get('p_values', [])):
+                    print(f"    - {feature}: {p_val}")
+            if ocs.get('coefficients'):
+                print(f"  Regression Coefficients:")
+                for feature, coef in zip(ocs.get('feature_names', []), ocs.get('coefficients', [])):
+                    print(f"    - {feature}: {coef}")
+            if ocs.get('pca_variance'):
+                print(f"  PCA Explained Variance Ratio:")
+                for i, var in enumerate(ocs.get('pca_variance', []), 1):
+                    print(f"    - Component {i}: {var}")
+            if ocs.get('bootstrap'):
+                bootstrap = ocs['bootstrap']
+                print(f"  Bootstrap {bootstrap['confidence']:.0%} CIs ({bootstrap['resamples']} resamples):")
+                print(f"    - R²: {bootstrap['r_squared']}")
+                for feature, interval in zip(ocs.get('feature_names', []), bootstrap['coefficients']):
+                    print(f"    - {feature}: {interval}")
+            if ocs.get('permutation'):
+                print(f"  Permutation test R² p-value ({ocs['permutation']['permutations']} shuffles): "
+                      f"{ocs['permutation']['r_squared_p_value']}")
+        else:
+            print(f"  {ocs}")
+    else:
+        print("  Unable to calculate OCI")
+
+    # Display per-agent LLM latency breakdown (streaming mode)
+    telemetry = final_state.get("agent_telemetry")
+    if telemetry:
+        print("\n⏱️  Agent LLM Telemetry (ms):")
+        print(f"  {'agent':<14}{'TTFT':>9}{'LLM':>10}{'tools':>10}{'total':>10}{'calls':>7}{'tokens in/out':>16}")
+        for agent, t in sorted(telemetry.items(), key=lambda item: -item[1].get("total_ms", 0)):
+            print(f"  {agent:<14}{t.get('ttft_ms') or 0:>9.1f}{t['generation_ms']:>10.1f}{t['tool_ms']:>10.1f}"
+                  f"{t['total_ms']:>10.1f}{t['llm_calls']:>7}{t['input_tokens']:>9}/{t['output_tokens']}")
+
+    # Display consolidated narrative insights
+    insights = final_state.get("insights")
+    if insights:
+        print("\n📝 Agent Insights:")
+        for agent, section in insights.items():
+            print(f"  [{agent}] {section.get('summary', '')}")
+            for finding in section.get("key_findings", []):
+                print(f"    • {finding}")
+            for recommendation in section.get("recommendations", []):
+                print(f"    → {recommendation}")
+
+    # ===== VISUALIZATIONS =====
+    if args.no_plots:
+        print("\n⏭️  Skipping visualizations (--no-plots)")
+    else:
+        plot_results(df, ocs)
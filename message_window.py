@@ -0,0 +1,98 @@
+"""
+Message Window Policy for Agent Chat History
+Keeps AgentState.messages bounded: older turns beyond a token budget are folded into a
+rolling summary message, and each agent receives only its own recent turns (the
+correlation agent sees every agent) trimmed to a per-agent token budget.
+"""
+import os
+from typing import List, Optional
+
+from langchain_core.messages import AnyMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+
+# Token budgets (approximate tokens, overridable through the environment)
+STATE_TOKEN_BUDGET = int(os.getenv("STATE_TOKEN_BUDGET", "4000"))
+AGENT_HISTORY_TOKEN_BUDGET = int(os.getenv("AGENT_HISTORY_TOKEN_BUDGET", "1500"))
+SUMMARY_MAX_CHARS = 2000
+SUMMARY_LINE_CHARS = 160
+
+SUMMARY_NAME = "history_summary"
+
+# Agents whose prompt should include every agent's turns rather than only their own
+SHARED_HISTORY_AGENTS = {"correlation"}
+
+
+def _is_summary(message: AnyMessage) -> bool:
+    return isinstance(message, SystemMessage) and message.name == SUMMARY_NAME
+
+
+def _summary_line(message: AnyMessage) -> str:
+    speaker = message.name or message.type
+    text = " ".join(str(message.content).split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 3] + "..."
+    return f"- {speaker} ({message.type}): {text}"
+
+
+def summarize_messages(summary: Optional[AnyMessage], folded: List[AnyMessage]) -> SystemMessage:
+    """
+    Fold older messages into the rolling summary (extractive, no LLM call).
+    The summary keeps its most recent lines within SUMMARY_MAX_CHARS.
+    """
+    lines = str(summary.content).splitlines()[1:] if summary is not None else []
+    lines += [_summary_line(m) for m in folded]
+
+    kept, size = [], 0
+    for line in reversed(lines):
+        if size + len(line) + 1 > SUMMARY_MAX_CHARS:
+            break
+        kept.append(line)
+        size += len(line) + 1
+
+    content = "Summary of earlier agent turns:\n" + "\n".join(reversed(kept))
+    return SystemMessage(content=content, name=SUMMARY_NAME)
+
+
+def add_bounded_messages(left: Optional[List[AnyMessage]], right: Optional[List[AnyMessage]]) -> List[AnyMessage]:
+    """
+    State reducer for messages: append like `operator.add`, then fold the oldest
+    turns into a single summary message once the list exceeds STATE_TOKEN_BUDGET.
+    """
+    messages = list(left or []) + list(right or [])
+    if count_tokens_approximately(messages) <= STATE_TOKEN_BUDGET:
+        return messages
+
+    summary = next((m for m in messages if _is_summary(m)), None)
+    turns = [m for m in messages if not _is_summary(m)]
+    summary_tokens = min(count_tokens_approximately([summary]) if summary else 0, SUMMARY_MAX_CHARS // 4)
+
+    recent = trim_messages(
+        turns,
+        max_tokens=max(STATE_TOKEN_BUDGET - summary_tokens - SUMMARY_MAX_CHARS // 4, 0),
+        token_counter=count_tokens_approximately,
+        strategy="last",
+    )
+    folded = turns[:len(turns) - len(recent)]
+    return [summarize_messages(summary, folded)] + recent
+
+
+def history_for(agent_name: str, messages: List[AnyMessage],
+                max_tokens: int = AGENT_HISTORY_TOKEN_BUDGET) -> List[AnyMessage]:
+    """
+    Chat history for one agent: the rolling summary plus the agent's own recent turns
+    (all agents' turns for SHARED_HISTORY_AGENTS), trimmed to max_tokens.
+    """
+    summary = next((m for m in messages or [] if _is_summary(m)), None)
+    turns = [
+        m for m in messages or []
+        if not _is_summary(m) and (agent_name in SHARED_HISTORY_AGENTS or m.name == agent_name)
+    ]
+
+    history = ([summary] if summary is not None else []) + turns
+    return trim_messages(
+        history,
+        max_tokens=max_tokens,
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        include_system=True,
+    )
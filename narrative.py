@@ -0,0 +1,68 @@
+"""
+Consolidated Narrative Mode
+Instead of one tool-calling agent loop per agent, the metrics are computed
+deterministically and a single structured LLM call writes every agent's insight
+section from a compact summary of all results.
+"""
+from typing import Dict, List
+
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from tool_output import metric_summary, to_compact_json
+
+NARRATIVE_MODES = ("agents", "consolidated")
+
+# Metric column produced by each analysis agent
+AGENT_METRICS = {
+    "productivity": "TCR",
+    "sentiment": "SPI",
+    "compliance": "DCR",
+    "interaction": "CI",
+}
+
+NARRATIVE_TOKEN_BUDGET = 1200
+
+
+class AgentInsight(BaseModel):
+    """Insight section for one agent"""
+    summary: str = Field(description="Two or three sentence interpretation of the metric")
+    key_findings: List[str] = Field(description="Most important observations, highest impact first")
+    recommendations: List[str] = Field(description="Concrete actions for managers")
+
+
+class NarrativeReport(BaseModel):
+    """Insight sections for all agents, produced in one call"""
+    productivity: AgentInsight = Field(description="Task Completion Ratio (TCR) insights")
+    sentiment: AgentInsight = Field(description="Sentiment Polarity Index (SPI) insights")
+    compliance: AgentInsight = Field(description="Disclosure Compliance Rate (DCR) insights")
+    interaction: AgentInsight = Field(description="Collaboration Index (CI) insights")
+    correlation: AgentInsight = Field(description="Outcome Correlation Score (OCS) insights across metrics")
+
+
+def get_narrative_mode(state) -> str:
+    """Narrative mode for a run: per-agent loops ("agents", default) or one consolidated call"""
+    mode = state.get("narrative_mode") or "agents"
+    if mode not in NARRATIVE_MODES:
+        raise ValueError(f"Unknown narrative mode '{mode}' (expected one of {NARRATIVE_MODES})")
+    return mode
+
+
+def build_narrative_input(state) -> str:
+    """Compact JSON of every agent's metric summary and the correlation results"""
+    payload: Dict = {}
+    for agent, metric in AGENT_METRICS.items():
+        records = (state.get("entity_metrics") or {}).get(agent) or []
+        if records:
+            section = metric_summary(pd.DataFrame(records), metric, "EntityID", top_k=3)
+        else:
+            section = {"metric": metric, "mean": state.get(metric)}
+        payload[agent] = section
+
+    ocs = state.get("OCS") or {}
+    payload["correlation"] = {
+        key: ocs.get(key)
+        for key in ("r_squared", "significance", "feature_names", "coefficients", "p_values", "pca_variance")
+        if key in ocs
+    }
+    return to_compact_json(payload, max_tokens=NARRATIVE_TOKEN_BUDGET)
@@ -0,0 +1,253 @@
+"""
+Node Output Memoization for Multi-AI Agent System
+Caches LangGraph node outputs in a local SQLite store keyed by an input fingerprint
+(source file hashes, agent config and code version) and provides the SQLite checkpointer
+used to resume interrupted runs
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import functools
+import threading
+import importlib.util
+from contextlib import closing
+from typing import Callable, Dict, Iterable, Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from agent_config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, get_llm_provider
+from tool_output import TOOL_OUTPUT_FORMAT
+
+CACHE_DIR = os.path.join("results", ".cache")
+NODE_CACHE_PATH = os.path.join(CACHE_DIR, "node_cache.sqlite")
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "checkpoints.sqlite")
+
+# File hashes keyed by (path, mtime, size) so unchanged files are hashed once per process
+_file_hashes: Dict[tuple, str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    SHA-256 of a file's contents.
+    Missing files hash to a fixed marker so they still produce a stable key.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+
+    stat_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(stat_key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    with _file_hashes_lock:
+        _file_hashes[stat_key] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+def code_fingerprint(modules: Iterable[str]) -> Dict[str, str]:
+    """Hash the source files of the given modules (the node's code version)"""
+    fingerprint = {}
+    for module in modules:
+        spec = importlib.util.find_spec(module)
+        origin = spec.origin if spec is not None else None
+        fingerprint[module] = file_fingerprint(origin) if origin else "missing"
+    return fingerprint
+
+
+def config_fingerprint(prompt=None) -> Dict[str, str]:
+    """Agent configuration that changes node output: model settings, tool output format, prompt and LLM availability"""
+    return {
+        "model": DEFAULT_MODEL,
+        "temperature": str(DEFAULT_TEMPERATURE),
+        "tool_output_format": TOOL_OUTPUT_FORMAT,
+        "llm_provider": get_llm_provider(),
+        "llm_enabled": str(bool(os.getenv("OPENAI_API_KEY")) or get_llm_provider() == "fake"),
+        "prompt": prompt.pretty_repr() if prompt is not None else "",
+    }
+
+
+def node_fingerprint(name: str, files=(), modules=(), prompt=None, state_values=None,
+                     hasher: Callable[[str], str] = file_fingerprint) -> str:
+    """Combine all inputs of a node into a single cache key"""
+    payload = {
+        "node": name,
+        "files": {path: hasher(path) for path in files},
+        "code": code_fingerprint(modules),
+        "config": config_fingerprint(prompt),
+        "state": state_values or {},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class NodeCache:
+    """
+    SQLite store of node outputs.
+    Outputs are serialized with LangGraph's checkpoint serializer so messages round-trip.
+    File hashes are persisted by (path, mtime, size) so unchanged data files are not
+    re-read on every run.
+    """
+    def __init__(self, path: str = NODE_CACHE_PATH, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.serde = JsonPlusSerializer()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS node_outputs ("
+                "node TEXT NOT NULL, key TEXT NOT NULL, type TEXT NOT NULL, "
+                "payload BLOB NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (node, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, "
+                "size INTEGER NOT NULL, sha256 TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def file_fingerprint(self, path: str) -> str:
+        """
+        Change detection for a data file: reuse the stored hash while the file's
+        mtime and size are unchanged, otherwise rehash and record it.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return "missing"
+
+        abs_path = os.path.abspath(path)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT sha256 FROM file_hashes WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (abs_path, stat.st_mtime_ns, stat.st_size)
+            ).fetchone()
+        if row is not None:
+            return row[0]
+
+        sha256 = file_fingerprint(path)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+                (abs_path, stat.st_mtime_ns, stat.st_size, sha256)
+            )
+        return sha256
+
+    def lookup(self, name: str, state: Dict, files=(), modules=(), prompt=None,
+               state_keys=(), artifact_keys=()):
+        """
+        Fingerprint a node's inputs for the given state and look up its stored output.
+        Returns (key, output) where output is None on a miss or when a recorded
+        artifact file no longer exists.
+        """
+        node_files = files(state) if callable(files) else files
+        state_values = {key: state.get(key) for key in state_keys}
+        key = node_fingerprint(name, node_files, modules, prompt, state_values, hasher=self.file_fingerprint)
+
+        try:
+            cached = self.get(name, key)
+        except Exception as e:
+            print(f"⚠️  Node cache read error for {name}: {e}")
+            cached = None
+
+        if cached is not None and not all(
+            cached.get(artifact) and os.path.exists(cached[artifact]) for artifact in artifact_keys
+        ):
+            cached = None
+        return key, cached
+
+    def get(self, node: str, key: str) -> Optional[Dict]:
+        """Return the cached output for (node, key) or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT type, payload FROM node_outputs WHERE node = ? AND key = ?",
+                (node, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return self.serde.loads_typed((row[0], row[1]))
+
+    def put(self, node: str, key: str, output: Dict):
+        """Store a node output, dropping the oldest entries beyond max_entries"""
+        type_, payload = self.serde.dumps_typed(output)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO node_outputs (node, key, type, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (node, key, type_, payload, time.time())
+            )
+            conn.execute(
+                "DELETE FROM node_outputs WHERE rowid NOT IN "
+                "(SELECT rowid FROM node_outputs ORDER BY created_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self, node: Optional[str] = None):
+        """Drop cached outputs for one node or for all nodes"""
+        with closing(self._connect()) as conn, conn:
+            if node is None:
+                conn.execute("DELETE FROM node_outputs")
+            else:
+                conn.execute("DELETE FROM node_outputs WHERE node = ?", (node,))
+
+
+def memoize_node(node_fn: Callable, name: str, cache: NodeCache, files=(), modules=(),
+                 prompt=None, state_keys=(), artifact_keys=()) -> Callable:
+    """
+    Wrap a graph node so it returns its cached output when its inputs are unchanged.
+
+    Args:
+        node_fn: The node function (state -> updates)
+        name: Node name used as the cache namespace
+        cache: NodeCache instance
+        files: Source data files read by the node, or a callable mapping state to them
+        modules: Modules whose source defines the node's behaviour
+        prompt: Agent prompt template used by the node
+        state_keys: Upstream state values the node reads
+        artifact_keys: Output keys holding file paths that must still exist for a cache hit
+    """
+    @functools.wraps(node_fn)
+    def memoized(state):
+        key, cached = cache.lookup(name, state, files, modules, prompt, state_keys, artifact_keys)
+        if cached is not None:
+            print(f"⚡ {name} inputs unchanged - using cached output")
+            return cached
+
+        output = node_fn(state)
+        try:
+            cache.put(name, key, output)
+        except Exception as e:
+            print(f"⚠️  Node cache write error for {name}: {e}")
+        return output
+
+    return memoized
+
+
+def open_checkpointer(path: str = CHECKPOINT_PATH):
+    """
+    Create a LangGraph SQLite checkpointer so interrupted runs can resume.
+    Returns None if langgraph-checkpoint-sqlite is not installed.
+    """
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        print("⚠️  langgraph-checkpoint-sqlite not installed - runs will not be resumable")
+        return None
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    return SqliteSaver(conn)
@@ -0,0 +1,120 @@
+"""
+Process-Pool Execution Backend for CPU-Bound Graph Nodes
+Runs a node's deterministic metric computation in a persistent pool of worker
+processes so the parallel analysis branches are not serialized by the GIL.
+Result frames come back through shared memory as Arrow IPC buffers
+(pickle protocol 5 when pyarrow is not installed).
+"""
+import os
+import atexit
+import pickle
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Tuple
+
+import pandas as pd
+
+EXECUTION_BACKENDS = ("thread", "process")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Shared worker pool, created on first use and kept warm for the life of the process.
+    Workers are spawned (not forked) because LangGraph runs nodes from threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+        return _pool
+
+
+def shutdown_process_pool():
+    """Stop the shared worker pool (it is recreated on next use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+atexit.register(shutdown_process_pool)
+
+
+def _warm_worker():
+    """Import the agent stack and load the sentiment lexicon once per worker"""
+    import agent_tools  # noqa: F401
+    from textblob import TextBlob
+    TextBlob("warm up").sentiment
+
+
+def _arrow():
+    """pyarrow if installed (imported on first transfer), else None"""
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _encode_frame(df: pd.DataFrame) -> Tuple[str, memoryview]:
+    pa = _arrow()
+    if pa is not None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return "arrow", memoryview(sink.getvalue()).cast("B")
+    return "pickle", memoryview(pickle.dumps(df, protocol=5))
+
+
+def _decode_frame(fmt: str, payload: bytes) -> pd.DataFrame:
+    if fmt == "arrow":
+        pa = _arrow()
+        return pa.ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
+    return pickle.loads(payload)
+
+
+def _run_into_shared_memory(func: Callable, args: tuple) -> Tuple[str, int, str]:
+    """Worker side: run func and write the resulting frame into a new shared memory block"""
+    fmt, payload = _encode_frame(func(*args))
+    size = payload.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        shm.buf[:size] = payload
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return shm.name, size, fmt
+
+
+def run_in_process(func: Callable, *args) -> pd.DataFrame:
+    """
+    Run a module-level function returning a DataFrame in the worker pool.
+    The parent copies the frame out of shared memory and releases the block.
+    """
+    name, size, fmt = get_process_pool().submit(_run_into_shared_memory, func, args).result()
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        payload = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+    return _decode_frame(fmt, payload)
+
+
+def invoke_metrics_tool(tool_name: str, data_path: str) -> pd.DataFrame:
+    """Run one of the get_*_data tools (used as a picklable worker entry point)"""
+    import agent_tools
+    return getattr(agent_tools, tool_name).invoke({"file_path": data_path})
@@ -0,0 +1,168 @@
+"""
+Map-Reduce Sharding for the Analysis Agents
+Splits productivity, sentiment, compliance and interaction work into shard tasks by
+entity hash range using LangGraph's dynamic fan-out (Send). Each shard returns partial
+aggregates that merge_shards_node combines before correlation.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from langgraph.types import Send
+
+import graph_nodes
+from graph_nodes import ENTITY_METRIC_AGENTS, get_data_path, get_execution_backend, run_agent_reasoning
+from process_backend import run_in_process
+from narrative import get_narrative_mode
+from agents.ProductivityAgent import ProductivityAgent
+from agents.SentimentAgent import SentimentAgent
+from agents.ComplianceAgent import ComplianceAgent
+from agents.InteractionAgent import InteractionAgent
+
+
+def _project_order(record):
+    return int(str(record["EntityID"]).rsplit("_", 1)[-1])
+
+
+def _entity_order(record):
+    return str(record["EntityID"])
+
+
+# How each agent is sharded: metric column, agent class, entity key of a raw row,
+# column renamed to EntityID, and the record order of the unsharded node output
+SHARD_SPECS = {
+    "productivity": {
+        "metric": "TCR",
+        "agent": ProductivityAgent,
+        "entity_key": lambda data: data.index.to_series(),
+        "rename": {},
+        "order": _project_order,
+    },
+    "sentiment": {
+        "metric": "SPI",
+        "agent": SentimentAgent,
+        "entity_key": lambda data: data["Name"] if "Name" in data.columns else data["worker_id"],
+        "rename": {"Name": "EntityID"},
+        "order": _entity_order,
+    },
+    "compliance": {
+        "metric": "DCR",
+        "agent": ComplianceAgent,
+        "entity_key": lambda data: data["Company Name"],
+        "rename": {"Company Name": "EntityID"},
+        "order": _entity_order,
+    },
+    "interaction": {
+        "metric": "CI",
+        "agent": InteractionAgent,
+        "entity_key": lambda data: data["worker_id"],
+        "rename": {"worker_id": "EntityID"},
+        "order": _entity_order,
+    },
+}
+
+
+def shard_of(keys: pd.Series, n_shards: int) -> np.ndarray:
+    """
+    Assign each entity key to a shard by splitting the 64-bit hash space into
+    n_shards equal ranges. All rows of one entity land in the same shard.
+    """
+    hashes = pd.util.hash_pandas_object(keys.astype(str), index=False).to_numpy(dtype=np.uint64)
+    return ((hashes >> np.uint64(32)) * np.uint64(n_shards) >> np.uint64(32)).astype(np.int64)
+
+
+def make_shard_dispatcher(n_shards: int):
+    """Build the conditional-edge function that fans START out to shard tasks"""
+    def dispatch_shards(state) -> List[Send]:
+        sends = []
+        for agent_name in ENTITY_METRIC_AGENTS:
+            data_path = get_data_path(state, agent_name)
+            for shard in range(n_shards):
+                sends.append(Send("shard_task", {
+                    "agent": agent_name,
+                    "shard": shard,
+                    "n_shards": n_shards,
+                    "data_path": data_path,
+                    "execution_backend": get_execution_backend(state),
+                }))
+            # LLM narrative runs once per agent, alongside its shards
+            if get_narrative_mode(state) != "consolidated" and graph_nodes.get_agent_llm():
+                sends.append(Send("agent_reasoning", {
+                    "agent": agent_name,
+                    "data_path": data_path,
+                    "messages": state.get("messages", []),
+                    "streaming": state.get("streaming"),
+                    "run_id": state.get("run_id"),
+                }))
+        return sends
+    return dispatch_shards
+
+
+def compute_shard_metrics(agent_name: str, data_path: str, shard: int, n_shards: int) -> pd.DataFrame:
+    """Compute one agent's metrics (EntityID, metric) for the entities in one hash range"""
+    spec = SHARD_SPECS[agent_name]
+    agent = spec["agent"](data_path)
+    in_shard = shard_of(spec["entity_key"](agent.data), n_shards) == shard
+    agent.data = agent.data[in_shard].copy()
+
+    if agent.data.empty:
+        return pd.DataFrame(columns=["EntityID", spec["metric"]])
+    df = agent.get_metrics().rename(columns=spec["rename"])
+    return df[["EntityID", spec["metric"]]]
+
+
+def shard_node(task: Dict) -> Dict:
+    """
+    Map step: compute one agent's metrics for the entities in one hash range.
+    Returns per-entity records plus sum/count partials for the agent average.
+    """
+    metric = SHARD_SPECS[task["agent"]]["metric"]
+    args = (task["agent"], task["data_path"], task["shard"], task["n_shards"])
+
+    if get_execution_backend(task) == "process":
+        df = run_in_process(compute_shard_metrics, *args)
+    else:
+        df = compute_shard_metrics(*args)
+
+    records = df.to_dict("records")
+    total = float(df[metric].sum())
+    count = int(df[metric].count())
+
+    return {
+        "shard_results": [{
+            "agent": task["agent"],
+            "shard": task["shard"],
+            "records": records,
+            "sum": total,
+            "count": count,
+        }]
+    }
+
+
+def agent_reasoning_node(task: Dict) -> Dict:
+    """LLM reasoning for one agent while its shards compute the metrics"""
+    return run_agent_reasoning(task["agent"], task, task["data_path"])
+
+
+def merge_shards_node(state) -> Dict:
+    """
+    Reduce step: merge shard partials into the same updates the unsharded
+    analysis nodes produce (agent averages, entity records, completed agents).
+    """
+    partials = state.get("shard_results") or []
+    updates = {"entity_metrics": {}, "completed_agents": []}
+
+    for agent_name, spec in SHARD_SPECS.items():
+        parts = [p for p in partials if p["agent"] == agent_name]
+        if not parts:
+            continue
+        total = sum(p["sum"] for p in parts)
+        count = sum(p["count"] for p in parts)
+        records = sorted((r for p in parts for r in p["records"]), key=spec["order"])
+
+        updates[spec["metric"]] = total / count if count else None
+        updates["entity_metrics"][agent_name] = records
+        updates["completed_agents"].append(agent_name)
+
+    print(f"🧩 Merged {len(partials)} shard results for {', '.join(updates['completed_agents'])}")
+    return updates
@@ -1,6 +1,15 @@
 from typing import TypedDict, Optional, List, Dict, Any, Annotated
 from operator import add
 from langchain_core.messages import AnyMessage
+from message_window import add_bounded_messages
+
+
+def merge_dicts(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    """Reducer that merges keyed updates from parallel agents (later keys win)"""
+    merged = dict(left or {})
+    merged.update(right or {})
+    return merged
+
 
 class AgentState(TypedDict):
     """
@@ -13,12 +22,30 @@ class AgentState(TypedDict):
     DCR: Optional[float]  # Disclosure Compliance Rate
     CI: Optional[float]   # Collaboration Index
     OCS: Optional[Dict[str, Any]]  # Outcome Correlation Score
+    insights: Optional[Dict[str, Any]]  # Per-agent insight sections from consolidated narrative mode
+    
+    # Agent Communication - accumulate messages, older turns folded into a rolling summary
+    messages: Annotated[List[AnyMessage], add_bounded_messages]  # Message history for agents
     
-    # Agent Communication - accumulate messages
-    messages: Annotated[List[AnyMessage], add]  # Message history for agents
+    # Run Inputs - per-run datasets and output location (defaults apply when unset)
+    run_id: Optional[str]  # Identifies the run (scopes the tool result cache)
+    data_paths: Optional[Dict[str, str]]  # Dataset path by agent name
+    results_dir: Optional[str]  # Directory for this run's outputs
+    execution_backend: Optional[str]  # "thread" (default) or "process" for CPU-bound node compute
+    narrative_mode: Optional[str]  # "agents" (default, one LLM loop per agent) or "consolidated" (one LLM call)
+    streaming: Optional[bool]  # Stream LLM tokens and record per-agent latency telemetry
+    org_units: Optional[int]  # Synthetic organizational units built for correlation (default 100)
+    org_unit_seed: Optional[int]  # Seed of the organizational unit generator (default 42)
+    bootstrap_resamples: Optional[int]  # Bootstrap resamples for OCS confidence intervals (0 = off)
+    permutations: Optional[int]  # Outcome shuffles for permutation-test p-values (0 = t-test p-values)
+    rollup_levels: Optional[List[str]]  # Crosswalk hierarchy columns, coarsest first, to roll up and correlate at
     
     # Data Storage
     merged_data_path: Optional[str]  # Path to merged metrics CSV
+    entity_metrics: Annotated[Dict[str, List[Dict[str, Any]]], merge_dicts]  # Per-entity records by agent
+    shard_results: Annotated[List[Dict[str, Any]], add]  # Partial aggregates from sharded agents
     
     # Agent Status Tracking - collect completed agents
-    completed_agents: Annotated[List[str], add]  # Track which agents finished
\ No newline at end of file
+    stale_nodes: Optional[List[str]]  # Nodes an incremental run decided to re-execute
+    completed_agents: Annotated[List[str], add]  # Track which agents finished
+    agent_telemetry: Annotated[Dict[str, Dict[str, Any]], merge_dicts]  # TTFT, generation/tool latency and tokens by agent
@@ -0,0 +1,105 @@
+"""
+Streaming LLM Output and Per-Agent Latency Telemetry
+In streaming mode each agent's runnable is driven through `astream_events`: tokens
+are forwarded to a sink as they arrive (the console by default) and the events are
+folded into a latency breakdown stored in AgentState.agent_telemetry:
+
+    ttft_ms         time from agent start to its first streamed token
+    generation_ms   total time inside LLM calls
+    tool_ms         total time inside tool calls
+    llm_calls / tool_calls / input_tokens / output_tokens
+    total_ms        wall time of the whole agent run
+"""
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+TokenSink = Callable[[str, str], None]
+
+
+class ConsoleTokenSink:
+    """Print streamed tokens, starting a tagged line whenever a different agent speaks"""
+    def __init__(self):
+        self._last_agent = None
+        self._lock = threading.Lock()
+
+    def __call__(self, agent_name: str, token: str):
+        with self._lock:
+            if agent_name != self._last_agent:
+                print(f"\n💬 [{agent_name}] ", end="")
+                self._last_agent = agent_name
+            print(token, end="", flush=True)
+
+
+_token_sink: Optional[TokenSink] = None
+
+
+def set_token_sink(sink: Optional[TokenSink]):
+    """Route streamed tokens to sink(agent_name, token); None restores the console sink"""
+    global _token_sink
+    _token_sink = sink
+
+
+def get_token_sink() -> TokenSink:
+    global _token_sink
+    if _token_sink is None:
+        _token_sink = ConsoleTokenSink()
+    return _token_sink
+
+
+async def _collect(runnable, inputs: Dict[str, Any], agent_name: str, sink: TokenSink) -> Tuple[Any, Dict]:
+    start = time.perf_counter()
+    llm_starts, tool_starts = {}, {}
+    telemetry = {
+        "ttft_ms": None, "generation_ms": 0.0, "tool_ms": 0.0,
+        "llm_calls": 0, "tool_calls": 0, "input_tokens": 0, "output_tokens": 0,
+    }
+    output, root_id = None, None
+
+    async for event in runnable.astream_events(inputs, version="v2"):
+        kind, run_id, now = event["event"], event["run_id"], time.perf_counter()
+        data = event.get("data") or {}
+        # The first event is the runnable's own start (it may be nested in a graph run)
+        root_id = root_id or run_id
+
+        if kind == "on_chat_model_start":
+            llm_starts[run_id] = now
+            telemetry["llm_calls"] += 1
+        elif kind == "on_chat_model_stream":
+            if telemetry["ttft_ms"] is None:
+                telemetry["ttft_ms"] = (now - start) * 1000
+            content = getattr(data.get("chunk"), "content", "")
+            if isinstance(content, str) and content:
+                sink(agent_name, content)
+        elif kind == "on_chat_model_end":
+            if telemetry["ttft_ms"] is None:
+                telemetry["ttft_ms"] = (now - start) * 1000
+            telemetry["generation_ms"] += (now - llm_starts.pop(run_id, now)) * 1000
+            usage = getattr(data.get("output"), "usage_metadata", None) or {}
+            telemetry["input_tokens"] += usage.get("input_tokens", 0)
+            telemetry["output_tokens"] += usage.get("output_tokens", 0)
+        elif kind == "on_tool_start":
+            # Tools invoked by another tool (cache and compact wrappers) are part of the outer call
+            if not any(parent in tool_starts for parent in event.get("parent_ids", [])):
+                tool_starts[run_id] = now
+                telemetry["tool_calls"] += 1
+        elif kind == "on_tool_end" and run_id in tool_starts:
+            telemetry["tool_ms"] += (now - tool_starts.pop(run_id)) * 1000
+        elif kind == "on_chain_end" and run_id == root_id:
+            output = data.get("output")
+
+    telemetry["total_ms"] = (time.perf_counter() - start) * 1000
+    for key in ("ttft_ms", "generation_ms", "tool_ms", "total_ms"):
+        if telemetry[key] is not None:
+            telemetry[key] = round(telemetry[key], 1)
+    return output, telemetry
+
+
+def stream_with_telemetry(runnable, inputs: Dict[str, Any], agent_name: str,
+                          sink: Optional[TokenSink] = None) -> Tuple[Any, Dict]:
+    """
+    Run a runnable (agent executor or chain) through astream_events, streaming its
+    tokens to the sink. Returns (final output, telemetry dict).
+    """
+    return asyncio.run(_collect(runnable, inputs, agent_name, sink or get_token_sink()))
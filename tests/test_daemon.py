@@ -0,0 +1,71 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from daemon import MAX_SHARDS, MonitoringService, create_server, parse_run_request
+
+
+def test_defaults_for_empty_body():
+    request = parse_run_request(b"")
+    assert request["shards"] == 1
+    assert request["org_units"] == 100
+    assert request["org_unit_seed"] == 42
+    assert request["execution_backend"] == "thread"
+    assert request["rollup_levels"] == []
+    assert request["run_id"].startswith("run-")
+
+
+@pytest.mark.parametrize("body", [
+    b"{not json",
+    b"[1, 2]",
+    b'{"shard": 2}',
+    b'{"shards": 0}',
+    b'{"shards": ' + str(MAX_SHARDS + 1).encode() + b"}",
+    b'{"shards": "many"}',
+    b'{"shards": true}',
+    b'{"org_units": 100000000}',
+    b'{"execution_backend": "gpu"}',
+    b'{"rollup_levels": "organization"}',
+    b'{"data_paths": ["a.csv"]}',
+])
+def test_client_mistakes_raise_value_error(body):
+    with pytest.raises(ValueError):
+        parse_run_request(body)
+
+
+class FailingService(MonitoringService):
+    def run(self, request):
+        raise RuntimeError("pipeline exploded")
+
+
+@pytest.fixture
+def server_url():
+    server = create_server(FailingService(use_cache=False), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/run"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body: bytes):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body, method="POST")) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_bad_request_gets_400(server_url):
+    status, body = post(server_url, b'{"shards": 10000}')
+    assert status == 400
+    assert "shards" in body["error"]
+
+
+def test_pipeline_failure_gets_500(server_url):
+    status, body = post(server_url, b'{"shards": 2}')
+    assert status == 500
+    assert body["error"] == "pipeline exploded"
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_client import CircuitBreaker, CircuitOpenError, LLMClientLimiter
+
+RESET_SECONDS = 0.05
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def fail(status_code: int):
+    raise ProviderError(status_code)
+
+
+def fail_stream(status_code: int):
+    raise ProviderError(status_code)
+    yield
+
+
+async def afail(status_code: int):
+    raise ProviderError(status_code)
+
+
+async def afail_stream(status_code: int):
+    raise ProviderError(status_code)
+    yield
+
+
+async def aok():
+    return "ok"
+
+
+async def aok_stream():
+    yield "ok"
+
+
+async def adrain(stream):
+    return [chunk async for chunk in stream]
+
+
+FAILING = {
+    "call": lambda limiter, status: limiter.call(lambda: fail(status)),
+    "stream": lambda limiter, status: list(limiter.stream(lambda: fail_stream(status))),
+    "acall": lambda limiter, status: asyncio.run(limiter.acall(lambda: afail(status))),
+    "astream": lambda limiter, status: asyncio.run(adrain(limiter.astream(lambda: afail_stream(status)))),
+}
+SUCCEEDING = {
+    "call": lambda limiter: limiter.call(lambda: "ok"),
+    "stream": lambda limiter: list(limiter.stream(lambda: iter(["ok"]))),
+    "acall": lambda limiter: asyncio.run(limiter.acall(aok)),
+    "astream": lambda limiter: asyncio.run(adrain(limiter.astream(aok_stream))),
+}
+
+
+def make_limiter(**kwargs) -> LLMClientLimiter:
+    return LLMClientLimiter(max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_seconds=RESET_SECONDS),
+                            **kwargs)
+
+
+def open_breaker(limiter: LLMClientLimiter):
+    with pytest.raises(ProviderError):
+        limiter.call(lambda: fail(503))
+    assert limiter.breaker.state == "open"
+    time.sleep(RESET_SECONDS * 1.2)
+
+
+@pytest.mark.parametrize("method", list(FAILING))
+def test_non_retryable_trial_releases_breaker(method):
+    limiter = make_limiter()
+    open_breaker(limiter)
+    with pytest.raises(ProviderError):
+        FAILING[method](limiter, 400)  # the half-open trial gets a client error
+    for _ in range(3):
+        SUCCEEDING[method](limiter)
+    assert limiter.breaker.state == "closed"
+
+
+def test_abandoned_trial_stream_releases_breaker():
+    limiter = make_limiter()
+    open_breaker(limiter)
+    stream = limiter.stream(lambda: iter(["a", "b"]))
+    assert next(stream) == "a"
+    stream.close()
+    assert limiter.call(lambda: "ok") == "ok"
+
+
+def test_open_breaker_rejects_without_calling_provider():
+    limiter = make_limiter()
+    with pytest.raises(ProviderError):
+        limiter.call(lambda: fail(503))
+    with pytest.raises(CircuitOpenError):
+        limiter.call(lambda: "ok")
+    assert limiter.stats()["rejected_by_breaker"] == 1
+
+
+def test_async_slot_waiters_are_served_in_arrival_order():
+    limiter = LLMClientLimiter(max_in_flight=1)
+    started = []
+
+    async def request(i):
+        async def work():
+            started.append(i)
+            await asyncio.sleep(0.02)
+            return i
+        return await limiter.acall(work)
+
+    async def main():
+        tasks = []
+        for i in range(8):  # arrivals spread over more than a polling interval
+            tasks.append(asyncio.create_task(request(i)))
+            await asyncio.sleep(0.003)
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == list(range(8))
+    assert started == list(range(8))
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_cancelled_slot_waiter_does_not_leak_the_slot():
+    limiter = LLMClientLimiter(max_in_flight=1)
+
+    async def hold():
+        await asyncio.sleep(0.05)
+        return "held"
+
+    async def main():
+        holder = asyncio.create_task(limiter.acall(hold))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(limiter.acall(aok))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert await holder == "held"
+        return await asyncio.wait_for(limiter.acall(aok), timeout=1.0)
+
+    assert asyncio.run(main()) == "ok"
+    time.sleep(0.01)
+    assert limiter._slots.acquire(blocking=False)
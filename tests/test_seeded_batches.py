@@ -0,0 +1,30 @@
+import numpy as np
+
+from agents.SeededBatches import BATCH_ELEMENTS, batch_sizes, map_seeded_batches
+
+
+def draw(size, seed):
+    return np.random.default_rng(seed).random(size)
+
+
+def test_batches_respect_draw_and_memory_caps():
+    assert batch_sizes(1200, 500, 10) == [500, 500, 200]
+    per_draw = BATCH_ELEMENTS // 3
+    assert batch_sizes(7, 500, per_draw) == [3, 3, 1]
+    assert batch_sizes(2, 500, BATCH_ELEMENTS * 2) == [1, 1]  # one draw per batch at least
+    assert batch_sizes(0, 500, 10) == []
+
+
+def test_results_are_seeded_and_in_batch_order():
+    first = map_seeded_batches(draw, 1200, seed=7, max_batch=500, values_per_draw=10)
+    second = map_seeded_batches(draw, 1200, seed=7, max_batch=500, values_per_draw=10)
+    assert [len(b) for b in first] == [500, 500, 200]
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    assert not np.array_equal(first[0][:200], first[2])
+
+
+def test_process_backend_matches_inline():
+    inline = map_seeded_batches(draw, 1200, seed=7, max_batch=500, values_per_draw=10)
+    pooled = map_seeded_batches(draw, 1200, seed=7, max_batch=500, values_per_draw=10,
+                                execution_backend="process")
+    assert all(np.array_equal(a, b) for a, b in zip(inline, pooled))
@@ -0,0 +1,137 @@
+"""
+Run-Scoped Tool Result Cache
+Within one graph run, agent tools are memoized by tool name plus normalized
+arguments, and the underlying agent metric computations are shared between
+tools, so repeated or overlapping calls (compute_*_metrics then get_*_data on
+the same file) return without recomputing.
+
+Each run's cache is selected through tool_run_scope(run_id) and dropped with
+release_run(run_id); the registry also keeps only the most recent runs.
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+MAX_TRACKED_RUNS = 32
+
+_current_run: ContextVar[Optional[str]] = ContextVar("tool_cache_run", default=None)
+
+
+class ToolCallCache:
+    """Results of one run: tool calls and agent metric frames, computed at most once per key"""
+    def __init__(self):
+        self._results: Dict[Any, Any] = {}
+        self._key_locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute: Callable[[], Any]):
+        """Return the cached value for key, computing it once even under concurrent callers"""
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._results:
+                    self.hits += 1
+                    return self._results[key]
+            value = compute()
+            with self._lock:
+                self._results[key] = value
+                self.misses += 1
+            return value
+
+
+_runs: "OrderedDict[str, ToolCallCache]" = OrderedDict()
+_runs_lock = threading.Lock()
+
+
+def get_run_cache(run_id: Optional[str] = None) -> Optional[ToolCallCache]:
+    """Cache of the given run (or the current scope's run); None outside any run"""
+    run_id = run_id or _current_run.get()
+    if not run_id:
+        return None
+    with _runs_lock:
+        cache = _runs.get(run_id)
+        if cache is None:
+            cache = _runs[run_id] = ToolCallCache()
+            while len(_runs) > MAX_TRACKED_RUNS:
+                _runs.popitem(last=False)
+        else:
+            _runs.move_to_end(run_id)
+        return cache
+
+
+def release_run(run_id: Optional[str]):
+    """Drop a finished run's cached results"""
+    with _runs_lock:
+        _runs.pop(run_id, None)
+
+
+@contextmanager
+def tool_run_scope(run_id: Optional[str]):
+    """Make tool calls inside the block use the cache of run_id"""
+    token = _current_run.set(run_id)
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+def _normalize_value(key: str, value):
+    if isinstance(value, str) and key.endswith("path"):
+        return os.path.normpath(os.path.abspath(value))
+    return value
+
+
+def normalize_tool_args(tool: BaseTool, args: Dict[str, Any]) -> str:
+    """Canonical form of a call's arguments: schema defaults filled in, paths absolute, keys sorted"""
+    try:
+        args = tool.get_input_schema().model_validate(args).model_dump()
+    except Exception:
+        args = dict(args)
+    return json.dumps({k: _normalize_value(k, v) for k, v in args.items()}, sort_keys=True, default=str)
+
+
+def agent_metrics(agent_cls, file_path: Optional[str]):
+    """
+    agent_cls(file_path).get_metrics(), computed once per run and file.
+    Outside a run this simply computes the metrics.
+    """
+    compute = lambda: agent_cls(file_path).get_metrics()
+    cache = get_run_cache()
+    if cache is None:
+        return compute()
+    key = ("metrics", agent_cls.__name__, _normalize_value("file_path", file_path))
+    return cache.get_or_compute(key, compute)
+
+
+def run_cached_tool(tool: BaseTool) -> BaseTool:
+    """Same-named wrapper of a tool whose results are memoized per run by normalized arguments"""
+    def run(**kwargs):
+        cache = get_run_cache()
+        if cache is None:
+            return tool.invoke(kwargs)
+        key = ("tool", tool.name, normalize_tool_args(tool, kwargs))
+        return cache.get_or_compute(key, lambda: tool.invoke(kwargs))
+
+    return StructuredTool.from_function(
+        func=run,
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+    )
+
+
+def run_cached_tools(tools: List[BaseTool]) -> List[BaseTool]:
+    return [run_cached_tool(t) for t in tools]
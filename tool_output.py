@@ -0,0 +1,108 @@
+"""
+Compact Tool Output Formatting
+Renders agent tool results as small JSON documents with fixed fields, top-k lists
+and limited numeric precision, held under a per-result token budget, so tool
+results add as few prompt tokens as possible to each agent turn.
+
+TOOL_OUTPUT_FORMAT=text restores the original prose summaries.
+"""
+import os
+import json
+import math
+from typing import Dict
+
+import pandas as pd
+
+TOOL_OUTPUT_FORMAT = os.getenv("TOOL_OUTPUT_FORMAT", "json")
+TOOL_OUTPUT_TOKEN_BUDGET = int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "250"))
+TOP_K = 5
+PRECISION = 3
+
+
+def compact_output_enabled() -> bool:
+    return TOOL_OUTPUT_FORMAT.lower() != "text"
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return math.ceil(len(text) / 4)
+
+
+def round_values(value, digits: int = PRECISION):
+    """Round floats (including numpy scalars) nested in dicts and lists"""
+    if isinstance(value, dict):
+        return {k: round_values(v, digits) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_values(v, digits) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float):
+        return None if math.isnan(value) else round(value, digits)
+    return value
+
+
+def metric_summary(df: pd.DataFrame, metric: str, id_col: str, top_k: int = TOP_K) -> Dict:
+    """Fixed-field summary of one metric column: count, mean, min, median, max and the top/bottom k entities"""
+    values = df[metric]
+    summary = {
+        "metric": metric,
+        "count": int(values.count()),
+        "mean": values.mean(),
+        "min": values.min(),
+        "median": values.median(),
+        "max": values.max(),
+    }
+    ranked = df[[id_col, metric]].dropna()
+    summary["top"] = [[str(i), v] for i, v in ranked.nlargest(top_k, metric).itertuples(index=False)]
+    summary["bottom"] = [[str(i), v] for i, v in ranked.nsmallest(top_k, metric).itertuples(index=False)]
+    return summary
+
+
+def to_compact_json(payload: Dict, max_tokens: int = TOOL_OUTPUT_TOKEN_BUDGET) -> str:
+    """
+    Serialize a payload as minified JSON within max_tokens.
+    Lists are shortened from the end, longest first, until the result fits;
+    if it still does not fit only scalar fields are kept.
+    """
+    payload = round_values(payload)
+
+    def dump(obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def lists(obj):
+        if isinstance(obj, dict):
+            for v in obj.values():
+                yield from lists(v)
+        elif isinstance(obj, list):
+            if obj and not all(isinstance(v, list) for v in obj):
+                # scalar lists ([id, value] pairs, column names) are kept whole
+                return
+            yield obj
+            for v in obj:
+                yield from lists(v)
+
+    text = dump(payload)
+    while approx_tokens(text) > max_tokens:
+        candidates = [l for l in lists(payload) if l]
+        if not candidates:
+            break
+        max(candidates, key=len).pop()
+        payload["truncated"] = True
+        text = dump(payload)
+
+    if approx_tokens(text) > max_tokens:
+        scalars = {k: v for k, v in payload.items() if not isinstance(v, (dict, list))}
+        scalars["truncated"] = True
+        text = dump(scalars)
+    return text
+
+
+def frame_payload(df: pd.DataFrame, metric: str, id_col: str, top_k: int = TOP_K) -> Dict:
+    """Compact description of a metrics DataFrame in place of the full table"""
+    if "error" in df.columns:
+        return {"error": str(df["error"].iloc[0])}
+    return {
+        "rows": len(df),
+        "columns": list(df.columns),
+        **metric_summary(df, metric, id_col, top_k),
+    }